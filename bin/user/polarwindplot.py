@@ -54,9 +54,11 @@ Revision History
 # TODO: Testing. Test use of data_binding config option
 
 # python imports
+import bisect
 import datetime
 import math
 import os.path
+import threading
 import time
 # first try to import from PIL then revert to python-imaging if an error
 try:
@@ -69,6 +71,13 @@ except ImportError:
 # compatibility shims
 import six
 
+# Use a monotonic clock for timing where available. time.perf_counter() is not
+# available under python 2 so fall back to time.time().
+try:
+    perf_counter = time.perf_counter
+except AttributeError:
+    perf_counter = time.time
+
 # WeeWX imports
 import weewx
 import weewx.units
@@ -111,8 +120,19 @@ except ImportError:
 
 
 POLAR_WIND_PLOT_VERSION = '0.1.2'
+# the version string displayed on plots
+POLAR_WIND_PLOT_VERSION_TEXT = 'v%s' % POLAR_WIND_PLOT_VERSION
 DEFAULT_PLOT_COLORS = ['lightblue', 'blue', 'midnightblue', 'forestgreen',
                        'limegreen', 'green', 'greenyellow']
+# cache of colours parsed by _getrgb()
+_RGB_CACHE = {}
+# cache of resized background images keyed by real file path and target size
+_BACKGROUND_CACHE = {}
+# cache of the most recently formatted timestamp label keyed by timestamp and
+# format
+_TIMESTAMP_LABEL_CACHE = {}
+# the default plot colours as rgb tuples, parsed once at import
+_DEFAULT_PLOT_COLORS_RGB = [ImageColor.getrgb(c) for c in DEFAULT_PLOT_COLORS]
 DEFAULT_NUM_RINGS = 5
 DEFAULT_NO_PETALS = 16
 DEFAULT_PETAL_WIDTH = 0.8
@@ -122,6 +142,8 @@ DEFAULT_MARKER_SIZE = 2
 DEFAULT_PLOT_FONT_COLOR = 'black'
 DEFAULT_RING_LABEL_TIME_FORMAT = '%H:%M'
 DEFAULT_MAX_SPEED = 30
+# speed range band boundaries as a proportion of the maximum speed
+SPEED_FACTORS = (0.0, 0.1, 0.2, 0.3, 0.5, 0.7, 1.0)
 DISTANCE_LOOKUP = {'km_per_hour': 'km',
                    'mile_per_hour': 'mile',
                    'meter_per_second': 'km',
@@ -132,6 +154,18 @@ SPEED_LOOKUP = {'km_per_hour': 'km/h',
                 'knot': 'kn'}
 DEGREE_SYMBOL = u'\N{DEGREE SIGN}'
 PREFERRED_LABEL_QUADRANTS = [1, 2, 0, 3]
+# multiplier to convert degrees to radians, same as used by math.radians()
+DEG_TO_RAD = math.pi / 180.0
+# Sine and cosine of each whole degree from -360 to 719 degrees inclusive, used
+# when drawing curves. Index with the angle in degrees + 360.
+SIN_DEGREES = [math.sin(math.radians(d)) for d in range(-360, 720)]
+COS_DEGREES = [math.cos(math.radians(d)) for d in range(-360, 720)]
+# valid vertical and horizontal positions for timestamp and version labels
+VERTICAL_LOCATIONS = frozenset(('top', 'bottom'))
+HORIZONTAL_LOCATIONS = frozenset(('left', 'centre', 'center', 'right'))
+# supported speed archive fields and their corresponding direction fields
+WIND_DIRECTION_FIELDS = {'windSpeed': 'windDir',
+                         'windGust': 'windGustDir'}
 
 
 # =============================================================================
@@ -170,8 +204,30 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
         # determine how much logging is desired
         self.log_success = weeutil.weeutil.tobool(self.polar_dict.get('log_success',
                                                                       True))
+        # Get image file format. Can use any format PIL can write, default to
+        # png
+        self.image_format = self.polar_dict.get('format', 'png')
+        # Get any format specific options to be used when saving images. If
+        # not set the PIL defaults are used.
+        self.save_options = {}
+        if self.image_format.lower() == 'png':
+            # png compression level, 0 (none) to 9 (best)
+            if 'png_compress_level' in self.polar_dict:
+                self.save_options['compress_level'] = int(self.polar_dict['png_compress_level'])
+        elif self.image_format.lower() in ('jpg', 'jpeg'):
+            # jpeg quality, 1 (worst) to 95 (best)
+            if 'jpeg_quality' in self.polar_dict:
+                self.save_options['quality'] = int(self.polar_dict['jpeg_quality'])
         # initialise the plot period
         self.period = None
+        # cache of archive data vectors obtained during a plot run
+        self.vector_cache = {}
+        # image directories known to exist during a plot run
+        self.image_dirs = set()
+        # images saved during a plot run
+        self.saved_images = []
+        # images that could not be saved during a plot run and the reason
+        self.save_errors = []
 
     def run(self):
         """Main entry point for generator."""
@@ -197,15 +253,31 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
         """
 
         # time period taken to generate plots
-        t1 = time.time()
-        # set plot count to 0
-        ngen = 0
+        t1 = perf_counter()
+        # initialise the lists of images saved and images that could not be
+        # saved
+        self.saved_images = []
+        self.save_errors = []
+        # thread used to save the last image, None if no image is being saved
+        saver = None
+        # archive data may have changed since our last run so start with an
+        # empty data cache
+        self.vector_cache = {}
+        # the unit labels used for the plot data
+        unit_labels = self.skin_dict['Units']['Labels']
+        # we have not yet checked any image directories this run
+        self.image_dirs = set()
         # loop over each 'time span' section (eg day, week, month etc)
         for span in self.polar_dict.sections:
+            # accumulate all options from parent nodes, we only need to walk the
+            # config tree once per span as the options for each plot and
+            # source can be built on the options of its parent
+            span_options = weeutil.weeutil.accumulateLeaves(self.polar_dict[span])
             # now loop over all plot names in this 'time span' section
             for plot in self.polar_dict[span].sections:
                 # accumulate all options from parent nodes:
-                plot_options = weeutil.weeutil.accumulateLeaves(self.polar_dict[span][plot])
+                plot_options = accumulate_scalars(span_options,
+                                                  self.polar_dict[span][plot])
                 # get a polar wind plot object from the factory
                 plot_obj = self._polar_plot_factory(plot_options)
 
@@ -234,31 +306,36 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
                 # get the path of the image file we will save
                 image_root = os.path.join(self.config_dict['WEEWX_ROOT'],
                                           plot_options['HTML_ROOT'])
-                # Get image file format. Can use any format PIL can write,
-                # default to png
-                image_format = self.polar_dict.get('format', 'png')
                 # get full file name and path for plot
                 img_file = os.path.join(image_root, '%s.%s' % (plot,
-                                                               image_format))
+                                                               self.image_format))
 
                 # check whether this plot needs to be done at all, if not move
                 # onto the next plot
                 if self.skipThisPlot(plotgen_ts, img_file, plot):
                     continue
 
-                # create the directory in which the image will be saved, wrap
-                # in a try block in case it already exists
-                try:
-                    os.makedirs(os.path.dirname(img_file))
-                except OSError:
-                    # directory already exists (or perhaps some other error)
-                    pass
+                # Create the directory in which the image will be saved. Many
+                # plots share the same directory so only do this the first
+                # time we see a directory.
+                image_dir = os.path.dirname(img_file)
+                if image_dir not in self.image_dirs:
+                    # wrap in a try block in case the directory already exists
+                    try:
+                        os.makedirs(image_dir)
+                    except OSError as e:
+                        # the directory already exists or there was some other
+                        # error, if the latter log it
+                        if not os.path.isdir(image_dir):
+                            logerr("Unable to create directory '%s': %s" % (image_dir, e))
+                    self.image_dirs.add(image_dir)
 
                 # loop over each 'source' to be added to the plot
                 for source in self.polar_dict[span][plot].sections:
 
                     # accumulate options from parent nodes
-                    source_options = weeutil.weeutil.accumulateLeaves(self.polar_dict[span][plot][source])
+                    source_options = accumulate_scalars(plot_options,
+                                                        self.polar_dict[span][plot][source])
 
                     # Get plot title if explicitly requested, default to no
                     # title. Config option 'label' used for consistency with
@@ -270,25 +347,26 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
                     # windGust, windGustDir. If anything else default to
                     # windSpeed, windDir.`
                     sp_field = source_options.get('data_type', source)
-                    if sp_field == 'windSpeed':
-                        dir_field = 'windDir'
-                    elif sp_field == 'windGust':
-                        dir_field = 'windGustDir'
-                    else:
+                    dir_field = WIND_DIRECTION_FIELDS.get(sp_field)
+                    if dir_field is None:
                         sp_field = 'windSpeed'
                         dir_field = 'windDir'
                     # hit the archive to get speed and direction plot data
                     t_span = weeutil.weeutil.TimeSpan(plotgen_ts - self.period + 1,
                                                       plotgen_ts)
-                    (_, sp_t_vec, sp_vec_raw) = dbmanager.getSqlVectors(t_span,
-                                                                        sp_field)
-                    (_, dir_t_vec, dir_vec) = dbmanager.getSqlVectors(t_span,
-                                                                      dir_field)
+                    (_, sp_t_vec, sp_vec_raw) = self.get_vectors(dbmanager,
+                                                                 binding,
+                                                                 t_span,
+                                                                 sp_field)
+                    (_, dir_t_vec, dir_vec) = self.get_vectors(dbmanager,
+                                                               binding,
+                                                               t_span,
+                                                               dir_field)
                     # convert the speed values to the units to be used in the
                     # plot
                     speed_vec = self.converter.convert(sp_vec_raw)
                     # get the units label for our speed data
-                    units = self.skin_dict['Units']['Labels'][speed_vec.unit].strip()
+                    units = unit_labels[speed_vec.unit].strip()
 
                     # add the source data to be plotted to our plot object
                     plot_obj.add_data(sp_field,
@@ -298,38 +376,99 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
                                       len(sp_t_vec.value),
                                       units)
 
-                    # call the render() method of the polar plot object to
-                    # render the entire plot and produce an image
-                    image = plot_obj.render(title)
+                # if we have no sources there is nothing to plot so move onto
+                # the next plot
+                if not self.polar_dict[span][plot].sections:
+                    continue
 
-                    # now save the file, wrap in a try ... except in case we have
-                    # a problem saving
-                    try:
-                        image.save(img_file)
-                        ngen += 1
-                    except IOError as e:
-                        loginf("Unable to save to file '%s': %s" % (img_file, e))
+                # Call the render() method of the polar plot object to render
+                # the entire plot and produce an image. The plot is rendered
+                # and saved once all sources have been added.
+                image = plot_obj.render(title)
+
+                # Save the image in a separate thread so that image encoding
+                # can overlap with obtaining the data for, and rendering,
+                # the next plot. Only one image is saved at a time so wait
+                # for any previous save to complete.
+                if saver is not None:
+                    saver.join()
+                saver = threading.Thread(target=self.save_image,
+                                         args=(image, img_file))
+                saver.start()
+        # wait for the last image to be saved
+        if saver is not None:
+            saver.join()
+        # Log any images that could not be saved. If there is a problem (eg
+        # disk full) it will likely affect every image so log once rather than
+        # once per image.
+        if self.save_errors:
+            logerr("Unable to save %d images, first error was for file '%s': %s: %s" % (len(self.save_errors),
+                                                                                         self.save_errors[0][0],
+                                                                                         type(self.save_errors[0][1]).__name__,
+                                                                                         self.save_errors[0][1]))
         if self.log_success:
-            loginf("Generated %d images for %s in %.2f seconds" % (ngen,
+            loginf("Generated %d images for %s in %.2f seconds" % (len(self.saved_images),
                                                                    self.skin_dict['REPORT_NAME'],
-                                                                   time.time() - t1))
+                                                                   perf_counter() - t1))
+
+    def save_image(self, image, img_file):
+        """Save a plot image to file.
+
+        Inputs:
+            image:    the Image object to be saved
+            img_file: full path and file name of the image file
+        """
+
+        # Wrap in a try ... except in case we have a problem saving. We are
+        # run in a separate thread so any exception raised here would not
+        # reach the report engine; instead catch any exception (eg IOError if
+        # the disk is full or ValueError if the image format or save options
+        # are invalid) and save it, it will be logged at the end of the plot
+        # run.
+        try:
+            image.save(img_file, **self.save_options)
+            self.saved_images.append(img_file)
+        except Exception as e:
+            self.save_errors.append((img_file, e))
+
+    def get_vectors(self, dbmanager, binding, t_span, field):
+        """Get archive data vectors for a field over a time span.
+
+        Plots in a report often use the same data (eg a wind rose and a wind
+        spiral over the same period) so the vectors obtained from the
+        archive are cached for the duration of the plot run.
+
+        Inputs:
+            dbmanager: database manager used to access the archive
+            binding:   the data binding used by dbmanager
+            t_span:    TimeSpan object with the time span of the data required
+            field:     the archive field for which data is required
+
+        Returns:
+            a tuple of ValueTuples (start_vec, stop_vec, data_vec) as returned
+            by the getSqlVectors() method of the database manager
+        """
+
+        _key = (binding, t_span.start, t_span.stop, field)
+        try:
+            return self.vector_cache[_key]
+        except KeyError:
+            _vectors = dbmanager.getSqlVectors(t_span, field)
+            self.vector_cache[_key] = _vectors
+            return _vectors
 
     def _polar_plot_factory(self, plot_dict):
         """Factory method to produce a polar plot object."""
 
         # what type of plot is it, default to wind rose
         plot_type = plot_dict.get('plot_type', 'rose').lower()
+        # get the class for this type of plot
+        plot_class = POLAR_PLOT_TYPES.get(plot_type)
+        # if we don't know about the specified plot type raise an exception
+        if plot_class is None:
+            raise weewx.UnsupportedFeature('Unsupported polar wind plot type: %s' % plot_type)
         # create and return the relevant polar plot object
-        if plot_type == 'rose':
-            return PolarWindRosePlot(self.skin_dict, plot_dict, self.formatter)
-        elif plot_type == 'trail':
-            return PolarWindTrailPlot(self.skin_dict, plot_dict, self.formatter)
-        elif plot_type == 'spiral':
-            return PolarWindSpiralPlot(self.skin_dict, plot_dict, self.formatter)
-        elif plot_type == 'scatter':
-            return PolarWindScatterPlot(self.skin_dict, plot_dict, self.formatter)
-        # if we made it here we don't know about the specified plot so raise
-        raise weewx.UnsupportedFeature('Unsupported polar wind plot type: %s' % plot_type)
+        return plot_class(self.skin_dict, plot_dict, self.formatter)
 
     def skipThisPlot(self, ts, img_file, plot_name):
         """Determine whether the plot is to be skipped or not.
@@ -373,20 +512,28 @@ class PolarWindPlotGenerator(weewx.reportengine.ReportGenerator):
             loginf("Plot '%s' ignored, no period specified" % plot_name)
             return True
 
-        # The image definitely has to be generated if it doesn't exist.
-        if not os.path.exists(img_file):
+        # Plots with a period of less than 7 days are generated every report
+        # cycle, there is no need to look at the image file.
+        if self.period < 604800:
+            return False
+
+        # Get the age of the image. The image definitely has to be generated
+        # if it doesn't exist.
+        try:
+            age = ts - os.stat(img_file).st_mtime
+        except OSError:
             return False
 
         # If the image is older than 24 hours then regenerate
-        if ts - os.stat(img_file).st_mtime >= 86400:
+        if age >= 86400:
             return False
 
         # If period > 30 days and the image is less than 24 hours old then skip
-        if self.period > 2592000 and ts - os.stat(img_file).st_mtime < 86400:
+        if self.period > 2592000:
             return True
 
         # If period > 7 days and the image is less than 1 hour old then skip
-        if self.period >= 604800 and ts - os.stat(img_file).st_mtime < 3600:
+        if age < 3600:
             return True
 
         # otherwise, we must regenerate
@@ -442,17 +589,25 @@ class PolarWindPlot(object):
         # colours to be used in the plot
         _colors = weeutil.weeutil.option_as_list(plot_dict.get('plot_colors',
                                                                DEFAULT_PLOT_COLORS))
+        # keep only those colours that are valid, we keep the parsed rgb
+        # tuples so PIL does not need to parse the colours each time they are
+        # used
+        _names = []
         self.plot_colors = []
         for _color in _colors:
-            if parse_color(_color, None) is not None:
-                # we have a valid color so add it to our list
-                self.plot_colors.append(_color)
+            _rgb = parse_color(_color, None)
+            if _rgb is not None:
+                # we have a valid color so add it to our lists
+                _names.append(_color)
+                self.plot_colors.append(_rgb)
         # do we have at least 7 colors, if not go through DEFAULT_PLOT_COLORS
-        # and add any that are not already in self.plot_colors
+        # and add any that are not already in self.plot_colors, colours are
+        # matched by name
         if len(self.plot_colors) < 7:
-            for _color in DEFAULT_PLOT_COLORS:
-                if _color not in self.plot_colors:
-                    self.plot_colors.append(_color)
+            for _color, _rgb in zip(DEFAULT_PLOT_COLORS, _DEFAULT_PLOT_COLORS_RGB):
+                if _color not in _names:
+                    _names.append(_color)
+                    self.plot_colors.append(_rgb)
                 # break if we have at least 7 colors
                 if len(self.plot_colors) >= 7:
                     break
@@ -487,9 +642,11 @@ class PolarWindPlot(object):
         # Boundaries for speed range bands, these mark the colour boundaries
         # on the stacked bar in the legend. 7 elements only (ie 0, 10% of max,
         # 20% of max...100% of max)
-        self.speed_factors = [0.0, 0.1, 0.2, 0.3, 0.5, 0.7, 1.0]
+        self.speed_factors = SPEED_FACTORS
         # set up a list with speed range boundaries
         self.speed_list = []
+        # speed range boundaries used to bisect a speed into a speed range
+        self._speed_edges = []
 
         # get the timestamp format, use a sane default that should display
         # sensibly for all locales
@@ -518,11 +675,11 @@ class PolarWindPlot(object):
             _ts_loc = set(weeutil.weeutil.option_as_list(_ts_loc))
             # if we don't have a valid vertical position specified default to
             # 'bottom'
-            if not _ts_loc & {'top', 'bottom'}:
+            if not _ts_loc & VERTICAL_LOCATIONS:
                 _ts_loc.add('bottom')
             # if we don't have a valid horizontal position specified default to
             # 'right'
-            if not _ts_loc & {'left', 'centre', 'center', 'right'}:
+            if not _ts_loc & HORIZONTAL_LOCATIONS:
                 _ts_loc.add('right')
             # assign the resulting set to the timestamp_location property
             self.timestamp_location = _ts_loc
@@ -570,12 +727,12 @@ class PolarWindPlot(object):
                 _v_loc = set(weeutil.weeutil.option_as_list(_v_loc_opt))
                 # if we don't have a valid vertical position specified default
                 # to 'top'
-                if not _v_loc & {'top', 'bottom'}:
+                if not _v_loc & VERTICAL_LOCATIONS:
                     _v_loc.add('top')
                 # if we don't have a valid horizontal position specified
                 # default to 'right' but only if timestamp is not using
                 # 'right', in that case use 'left'
-                if not _v_loc & {'left', 'centre', 'center', 'right'}:
+                if not _v_loc & HORIZONTAL_LOCATIONS:
                     # there is no horizontal position specified so de-conflict
                     # with timestamp location
                     _temp_loc = _v_loc | {'left'}
@@ -585,6 +742,11 @@ class PolarWindPlot(object):
                         _v_loc.add('right')
                 # assign the resulting set to the version_location property
                 self.version_location = _v_loc
+        # the timestamp and version label locations are fixed so resolve each
+        # to a single vertical and horizontal anchor now rather than each
+        # time the label is rendered
+        self.timestamp_anchor = get_label_anchor(self.timestamp_location)
+        self.version_anchor = get_label_anchor(self.version_location)
 
         # get size of the arc to be kept clear for ring labels
         self.ring_label_clear_arc = plot_dict.get('ring_label_clear_arc', 30)
@@ -595,6 +757,11 @@ class PolarWindPlot(object):
         self.speed_vec = None
         self.dir_vec = None
         self.time_vec = None
+        # the speed, direction and time data values, these are used
+        # extensively when plotting
+        self.speeds = None
+        self.dirs = None
+        self.times = None
         self.samples = None
         self.units = None
 
@@ -603,6 +770,7 @@ class PolarWindPlot(object):
         self.title_height = None
 
         self.max_plot_dia = None
+        self.plot_radius = None
         self.origin_x = None
         self.origin_y = None
         self.plot_font = None
@@ -610,11 +778,14 @@ class PolarWindPlot(object):
         self.label_font = None
 
         self.draw = None
+        # cache of text sizes, keyed by text and font
+        self._text_cache = {}
 
         self.legend_percentage = None
         self.legend_title = None
 
         self.speed_bin = None
+        self.speed_bin_total = None
         self.label_dir = None
 
         self.timestamp = None
@@ -639,11 +810,8 @@ class PolarWindPlot(object):
         self.speed_field = speed_field
         # find maximum speed from our data, be careful as some or all values
         # could be None
-        try:
-            max_speed = weeutil.weeutil.max_with_none(speed_vec.value)
-        except TypeError:
-            # likely all our speed_vec values are None
-            max_speed = None
+        _speeds = [s for s in speed_vec.value if s is not None]
+        max_speed = max(_speeds) if _speeds else None
         # set upper speed range for our plot, set to a multiple of 10 for a
         # neater display
         if max_speed is not None:
@@ -654,6 +822,11 @@ class PolarWindPlot(object):
         self.speed_vec = speed_vec
         self.dir_vec = dir_vec
         self.time_vec = time_vec
+        # save references to the data values so they can be accessed without
+        # going through the ValueTuple each time
+        self.speeds = speed_vec.value
+        self.dirs = dir_vec.value
+        self.times = time_vec.value
         # how many samples in our data
         self.samples = samples
         # set the speed units label
@@ -667,11 +840,14 @@ class PolarWindPlot(object):
         legend or wherever speeds are categorised by a speed range.
         """
 
-        self.speed_list = [0, 0, 0, 0, 0, 0, 0]
-        # loop though each speed range boundary
-        for i in range(7):
-            # calculate the actual boundary speed value
-            self.speed_list[i] = self.speed_factors[i] * self.max_speed_range
+        # calculate the actual boundary speed value for each speed range
+        # boundary
+        self.speed_list = [factor * self.max_speed_range for factor in self.speed_factors]
+        # The speed range for a given speed is the number of speed range
+        # boundaries (excluding the top) that are less than the speed. Save
+        # these boundaries so that speed ranges may be found with a bisect
+        # rather than a cascade of comparisons.
+        self._speed_edges = [0] + self.speed_list[1:6]
 
     def set_title(self, title):
         """Set the plot title.
@@ -682,8 +858,8 @@ class PolarWindPlot(object):
 
         self.title = six.ensure_text(title)
         if title:
-            self.title_width, self.title_height = self.draw.textsize(self.title,
-                                                                     font=self.label_font)
+            self.title_width, self.title_height = self._text_size(self.title,
+                                                                  font=self.label_font)
         else:
             self.title_width = 0
             self.title_height = 0
@@ -697,10 +873,10 @@ class PolarWindPlot(object):
 
         # calculate plot diameter
         # first calculate the size of the cardinal compass direction labels
-        _w, _n_height = self.draw.textsize(self.north, font=self.plot_font)
-        _w, _s_height = self.draw.textsize(self.south, font=self.plot_font)
-        _w_width, _h = self.draw.textsize(self.west, font=self.plot_font)
-        _e_width, _h = self.draw.textsize(self.east, font=self.plot_font)
+        _n_height = self._theight(self.north, self.plot_font)
+        _s_height = self._theight(self.south, self.plot_font)
+        _w_width = self._twidth(self.west, self.plot_font)
+        _e_width = self._twidth(self.east, self.plot_font)
 
         # now calculate the plot area diameter in pixels, two diameters are
         # calculated, one based on image height and one based on image width
@@ -711,6 +887,9 @@ class PolarWindPlot(object):
         # to prevent optical distortion for small plots make diameter a multiple
         # of 22
         self.max_plot_dia = int(_diameter / 22.0) * 22
+        # the plot radius is used extensively when rendering so calculate it
+        # once now
+        self.plot_radius = self.max_plot_dia / 2
 
         # determine plot origin
         self.origin_x = int((self.image_width - self.legend_width - _e_width + _w_width) / 2)
@@ -732,7 +911,7 @@ class PolarWindPlot(object):
             else:
                 _text = '999'
             # estimate width of the legend
-            width, height = self.draw.textsize(_text, font=self.legend_font)
+            width, height = self._text_size(_text, font=self.legend_font)
             self.legend_width = int(width + 2 * self.legend_bar_width + 1.5 * self.plot_border)
             # get legend title
             self.legend_title = self.get_legend_title(self.speed_field)
@@ -750,110 +929,118 @@ class PolarWindPlot(object):
     def render_legend(self):
         """Render a polar plot legend."""
 
+        # local alias for our Draw object
+        draw = self.draw
+        # local copies of frequently used properties
+        legend_font = self.legend_font
+        legend_font_color = self.legend_font_color
+        legend_bar_width = self.legend_bar_width
+        plot_colors = self.plot_colors
         # do we need to render a legend?
         if self.legend:
             # org_x and org_y = x,y coords of bottom left of legend stacked bar,
             # everything else is relative to this point
 
             # first get the space required between the polar plot and the legend
-            _width, _height = self.draw.textsize('E', font=self.plot_font)
-            org_x = self.origin_x + self.max_plot_dia / 2 + _width + 10
-            org_y = self.origin_y + self.max_plot_dia / 2 - self.max_plot_dia / 22
+            _width, _height = self._text_size('E', font=self.plot_font)
+            org_x = self.origin_x + self.plot_radius + _width + 10
+            org_y = self.origin_y + self.plot_radius - self.max_plot_dia / 22
             # bulb diameter
-            bulb_d = int(round(1.2 * self.legend_bar_width, 0))
+            bulb_d = int(round(1.2 * legend_bar_width, 0))
+            # height of the stacked bar
+            bar_height = 0.85 * self.max_plot_dia
+            # height of the top of each band of the stacked bar above org_y
+            band_height = [bar_height * factor for factor in self.speed_factors]
+            # x coord of the right hand side of the stacked bar
+            bar_right = org_x + legend_bar_width
+            # x coord of the speed labels
+            label_x = org_x + 1.5 * legend_bar_width
             # draw stacked bar and label with values
             for i in range(6, 0, -1):
                 # draw the rectangle for the stacked bar
                 x0 = org_x
-                y0 = org_y - (0.85 * self.max_plot_dia * self.speed_factors[i])
-                x1 = org_x + self.legend_bar_width
+                y0 = org_y - band_height[i]
+                x1 = bar_right
                 y1 = org_y
-                self.draw.rectangle([(x0, y0), (x1, y1)],
-                                    fill=self.plot_colors[i],
-                                    outline='black')
+                draw.rectangle([(x0, y0), (x1, y1)],
+                               fill=plot_colors[i],
+                               outline='black')
                 # add the label
                 # first, position the label
-                label_width, label_height = self.draw.textsize(str(self.speed_list[i]),
-                                                               font=self.legend_font)
-                x = org_x + 1.5 * self.legend_bar_width
-                y = org_y - label_height / 2 - (0.85 * self.max_plot_dia * self.speed_factors[i])
-                # get the basic label text
-                snippets = (str(int(round(self.speed_list[i], 0))), )
-                # if required add a bracketed percentage
+                label_width, label_height = self._text_size(str(self.speed_list[i]),
+                                                            font=legend_font)
+                x = label_x
+                y = org_y - label_height / 2 - band_height[i]
+                # get the label text, if required add a bracketed percentage
                 if self.legend_percentage:
-                    snippets += (' (',
-                                 str(int(round(100 * self.speed_bin[i]/sum(self.speed_bin), 0))),
-                                 '%)')
-                # create the final label text
-                text = ''.join(snippets)
+                    text = '%d (%d%%)' % (int(round(self.speed_list[i], 0)),
+                                          int(round(100 * self.speed_bin[i]/self.speed_bin_total, 0)))
+                else:
+                    text = '%d' % int(round(self.speed_list[i], 0))
                 # render the label text
-                self.draw.text((x, y),
-                               text,
-                               fill=self.legend_font_color,
-                               font=self.legend_font)
+                draw.text((x, y),
+                          text,
+                          fill=legend_font_color,
+                          font=legend_font)
 
             # draw 'Calm' label and '0' speed label/percentage
             # position the 'Calm' label
-            t_width, t_height = self.draw.textsize('Calm', font=self.legend_font)
+            t_width, t_height = self._text_size('Calm', font=legend_font)
             x = org_x - t_width - 2
-            y = org_y - t_height / 2 - (0.85 * self.max_plot_dia * self.speed_factors[0])
+            y = org_y - t_height / 2 - band_height[0]
             # render the 'Calm' label
-            self.draw.text((x, y),
-                           'Calm',
-                           fill=self.legend_font_color,
-                           font=self.legend_font)
+            draw.text((x, y),
+                      'Calm',
+                      fill=legend_font_color,
+                      font=legend_font)
             # position the '0' speed label/percentage
-            t_width, t_height = self.draw.textsize(str(self.speed_list[0]),
-                                                   font=self.legend_font)
-            x = org_x + 1.5 * self.legend_bar_width
-            y = org_y - t_height / 2 - (0.85 * self.max_plot_dia * self.speed_factors[0])
-            # get the basic label text
-            snippets = (str(int(self.speed_list[0])), )
-            # if required add a bracketed percentage
+            t_width, t_height = self._text_size(str(self.speed_list[0]),
+                                                font=legend_font)
+            x = label_x
+            y = org_y - t_height / 2 - band_height[0]
+            # get the label text, if required add a bracketed percentage
             if self.legend_percentage:
-                snippets += (' (',
-                             str(int(round(100.0 * self.speed_bin[0] / sum(self.speed_bin), 0))),
-                             '%)')
-            # create the final label text
-            text = ''.join(snippets)
+                text = '%d (%d%%)' % (int(self.speed_list[0]),
+                                      int(round(100.0 * self.speed_bin[0] / self.speed_bin_total, 0)))
+            else:
+                text = '%d' % int(self.speed_list[0])
             # render the label
-            self.draw.text((x, y),
-                           text,
-                           fill=self.legend_font_color,
-                           font=self.legend_font)
+            draw.text((x, y),
+                      text,
+                      fill=legend_font_color,
+                      font=legend_font)
 
             # draw 'calm' bulb on bottom of stacked bar
-            bounding_box = (org_x - bulb_d / 2 + self.legend_bar_width / 2,
-                            org_y - self.legend_bar_width / 6,
-                            org_x + bulb_d / 2 + self.legend_bar_width / 2,
-                            org_y - self.legend_bar_width / 6 + bulb_d)
-            self.draw.ellipse(bounding_box, outline='black',
-                              fill=self.plot_colors[0])
+            bounding_box = (org_x - bulb_d / 2 + legend_bar_width / 2,
+                            org_y - legend_bar_width / 6,
+                            org_x + bulb_d / 2 + legend_bar_width / 2,
+                            org_y - legend_bar_width / 6 + bulb_d)
+            draw.ellipse(bounding_box, outline='black',
+                         fill=plot_colors[0])
 
             # draw legend title
             # position the legend title
-            t_width, t_height = self.draw.textsize(self.legend_title,
-                                                   font=self.legend_font)
-            x = org_x + self.legend_bar_width / 2 - t_width / 2
-            y = org_y - 5 * t_height / 2 - (0.85 * self.max_plot_dia)
+            t_width, t_height = self._text_size(self.legend_title,
+                                                font=legend_font)
+            x = org_x + legend_bar_width / 2 - t_width / 2
+            y = org_y - 5 * t_height / 2 - bar_height
             # render the title
-            self.draw.text((x, y),
-                           self.legend_title,
-                           fill=self.legend_font_color,
-                           font=self.legend_font)
+            draw.text((x, y),
+                      self.legend_title,
+                      fill=legend_font_color,
+                      font=legend_font)
 
             # draw legend units label
             # position the units label
-            t_width, t_height = self.draw.textsize('(' + self.units + ')',
-                                                   font=self.legend_font)
-            x = org_x + self.legend_bar_width / 2 - t_width / 2
-            y = org_y - 3 * t_height / 2 - (0.85 * self.max_plot_dia)
-            text = ''.join(('(', self.units, ')'))
+            text = '(%s)' % self.units
+            t_width, t_height = self._text_size(text, font=legend_font)
+            x = org_x + legend_bar_width / 2 - t_width / 2
+            y = org_y - 3 * t_height / 2 - bar_height
             # render the units label
-            self.draw.text((x, y),
-                           text,
-                           fill=self.legend_font_color,
-                           font=self.legend_font)
+            draw.text((x, y),
+                      text,
+                      fill=legend_font_color,
+                      font=legend_font)
 
     def render_polar_grid(self, bullseye=0):
         """Render polar plot grid.
@@ -866,34 +1053,42 @@ class PolarWindPlot(object):
                       as a proportion of the polar grid radius
         """
 
+        # local aliases for frequently used properties
+        draw = self.draw
+        origin_x = self.origin_x
+        origin_y = self.origin_y
+        plot_font = self.plot_font
+        plot_font_color = self.plot_font_color
+        plot_radius = self.plot_radius
+        ring_color = self.image_back_range_ring_color
         # render the rings
 
         # calculate the space in pixels between each ring
         ring_space = (1 - bullseye) * self.max_plot_dia/(2.0 * self.rings)
         # calculate the radius of the bullseye in pixels
-        bullseye_radius = bullseye * self.max_plot_dia / 2.0
+        bullseye_radius = bullseye * plot_radius
         # locate/size then render each ring starting from the outside
         for i in range(self.rings, 0, -1):
             # create a bound box for the ring
-            bbox = (self.origin_x - ring_space * i - bullseye_radius,
-                    self.origin_y - ring_space * i - bullseye_radius,
-                    self.origin_x + ring_space * i + bullseye_radius,
-                    self.origin_y + ring_space * i + bullseye_radius)
+            bbox = (origin_x - ring_space * i - bullseye_radius,
+                    origin_y - ring_space * i - bullseye_radius,
+                    origin_x + ring_space * i + bullseye_radius,
+                    origin_y + ring_space * i + bullseye_radius)
             # render the ring
-            self.draw.ellipse(bbox,
-                              outline=self.image_back_range_ring_color,
-                              fill=self.image_back_circle_color)
+            draw.ellipse(bbox,
+                         outline=ring_color,
+                         fill=self.image_back_circle_color)
 
         # render the ring labels
 
-        # first, initialise a list to hold the labels
-        labels = list((None for x in range(self.rings)))
-        # loop over the rings getting the label for each ring
-        for i in range(self.rings):
-            labels[i] = self.get_ring_label(i + 1)
+        # first, get the label for each ring
+        labels = [self.get_ring_label(i + 1) for i in range(self.rings)]
         # Calculate location of ring labels. First we need the angle to use,
         # remember the angle is in radians.
         angle = (3.5 + int(self.label_dir / 4.0)) * math.pi / 2
+        # the angle is the same for every label so get its cos and sin once
+        cos_angle = math.cos(angle)
+        sin_angle = math.sin(angle)
         # Now draw ring labels. For clarity each label (except for outside
         # label) is drawn on a rectangle with background colour set to that of
         # the polar plot background.
@@ -902,77 +1097,77 @@ class PolarWindPlot(object):
             # we only need do anything if we have a label for this ring
             if labels[i] is not None:
                 # calculate the width and height of the label text
-                width, height = self.draw.textsize(labels[i],
-                                                   font=self.plot_font)
+                width, height = self._text_size(labels[i],
+                                                font=plot_font)
                 # find the distance of the midpoint of the text box from the
                 # plot origin
                 radius = bullseye_radius + (i + 1) * ring_space
                 # calculate x and y coords (top left corner) for the text
-                x0 = self.origin_x + int(radius * math.cos(angle) - width / 2.0)
-                y0 = self.origin_y + int(radius * math.sin(angle) - height / 2.0)
+                x0 = origin_x + int(radius * cos_angle - width / 2.0)
+                y0 = origin_y + int(radius * sin_angle - height / 2.0)
                 # the innermost labels have a background box painted first
                 if i < self.rings - 1:
                     # calculate the bottom right corner of the background box
-                    x1 = self.origin_x + int(radius * math.cos(angle) + width / 2.0)
-                    y1 = self.origin_y + int(radius * math.sin(angle) + height / 2.0)
+                    x1 = origin_x + int(radius * cos_angle + width / 2.0)
+                    y1 = origin_y + int(radius * sin_angle + height / 2.0)
                     # draw the background box
-                    self.draw.rectangle([(x0, y0), (x1, y1)],
-                                        fill=self.image_back_circle_color)
+                    draw.rectangle([(x0, y0), (x1, y1)],
+                                   fill=self.image_back_circle_color)
                 # now draw the label text
-                self.draw.text((x0, y0),
-                               labels[i],
-                               fill=self.plot_font_color,
-                               font=self.plot_font)
+                draw.text((x0, y0),
+                          labels[i],
+                          fill=plot_font_color,
+                          font=plot_font)
 
         # render vertical centre line
-        x0 = self.origin_x
-        y0 = self.origin_y - self.max_plot_dia / 2 - 2
-        x1 = self.origin_x
-        y1 = self.origin_y + self.max_plot_dia / 2 + 2
-        self.draw.line([(x0, y0), (x1, y1)],
-                       fill=self.image_back_range_ring_color)
+        x0 = origin_x
+        y0 = origin_y - plot_radius - 2
+        x1 = origin_x
+        y1 = origin_y + plot_radius + 2
+        draw.line([(x0, y0), (x1, y1)],
+                  fill=ring_color)
 
         # render horizontal centre line
-        x0 = self.origin_x - self.max_plot_dia / 2 - 2
-        y0 = self.origin_y
-        x1 = self.origin_x + self.max_plot_dia / 2 + 2
-        y1 = self.origin_y
-        self.draw.line([(x0, y0), (x1, y1)],
-                       fill=self.image_back_range_ring_color)
+        x0 = origin_x - plot_radius - 2
+        y0 = origin_y
+        x1 = origin_x + plot_radius + 2
+        y1 = origin_y
+        draw.line([(x0, y0), (x1, y1)],
+                  fill=ring_color)
 
         # render N,S,E,W markers
         # North
-        width, height = self.draw.textsize(self.north, font=self.plot_font)
-        x = self.origin_x - width / 2
-        y = self.origin_y - self.max_plot_dia / 2 - 1 - height
-        self.draw.text((x, y),
-                       self.north,
-                       fill=self.plot_font_color,
-                       font=self.plot_font)
+        width, height = self._text_size(self.north, plot_font)
+        x = origin_x - width / 2
+        y = origin_y - plot_radius - 1 - height
+        draw.text((x, y),
+                  self.north,
+                  fill=plot_font_color,
+                  font=plot_font)
         # South
-        width, height = self.draw.textsize(self.south, font=self.plot_font)
-        x = self.origin_x - width / 2
-        y = self.origin_y + self.max_plot_dia / 2 + 3
-        self.draw.text((x, y),
-                       self.south,
-                       fill=self.plot_font_color,
-                       font=self.plot_font)
+        width, height = self._text_size(self.south, plot_font)
+        x = origin_x - width / 2
+        y = origin_y + plot_radius + 3
+        draw.text((x, y),
+                  self.south,
+                  fill=plot_font_color,
+                  font=plot_font)
         # West
-        width, height = self.draw.textsize(self.west, font=self.plot_font)
-        x = self.origin_x - self.max_plot_dia / 2 - 1 - width
-        y = self.origin_y - height / 2
-        self.draw.text((x, y),
-                       self.west,
-                       fill=self.plot_font_color,
-                       font=self.plot_font)
+        width, height = self._text_size(self.west, plot_font)
+        x = origin_x - plot_radius - 1 - width
+        y = origin_y - height / 2
+        draw.text((x, y),
+                  self.west,
+                  fill=plot_font_color,
+                  font=plot_font)
         # East
-        width, height = self.draw.textsize(self.east, font=self.plot_font)
-        x = self.origin_x + self.max_plot_dia / 2 + 1
-        y = self.origin_y - height / 2
-        self.draw.text((x, y),
-                       self.east,
-                       fill=self.plot_font_color,
-                       font=self.plot_font)
+        width, height = self._text_size(self.east, plot_font)
+        x = origin_x + plot_radius + 1
+        y = origin_y - height / 2
+        draw.text((x, y),
+                  self.east,
+                  fill=plot_font_color,
+                  font=plot_font)
 
     def render_title(self):
         """Render polar plot title."""
@@ -996,19 +1191,19 @@ class PolarWindPlot(object):
         # we only render if we have a location to put the timestamp otherwise
         # we have nothing to do
         if self.timestamp_location:
-            _dt = datetime.datetime.fromtimestamp(self.timestamp)
-            text = _dt.strftime(self.timestamp_format)
-            width, height = self.draw.textsize(text, font=self.label_font)
-            if 'top' in self.timestamp_location:
-                y = self.plot_border + height
-            else:
-                y = self.image_height - self.plot_border - height
-            if 'left' in self.timestamp_location:
-                x = self.plot_border
-            elif ('center' in self.timestamp_location) or ('centre' in self.timestamp_location):
-                x = self.origin_x - width / 2
-            else:
-                x = self.image_width - self.plot_border - width
+            # Every plot in a report run has the same timestamp so only format
+            # the timestamp if it or the format has changed since it was last
+            # formatted. Only the most recent label is kept.
+            _key = (self.timestamp, self.timestamp_format)
+            try:
+                text = _TIMESTAMP_LABEL_CACHE[_key]
+            except KeyError:
+                _dt = datetime.datetime.fromtimestamp(self.timestamp)
+                text = _dt.strftime(self.timestamp_format)
+                _TIMESTAMP_LABEL_CACHE.clear()
+                _TIMESTAMP_LABEL_CACHE[_key] = text
+            width, height = self._text_size(text, font=self.label_font)
+            x, y = self.get_label_xy(self.timestamp_anchor, width, height)
             self.draw.text((x, y), text,
                            fill=self.label_font_color,
                            font=self.label_font)
@@ -1019,23 +1214,39 @@ class PolarWindPlot(object):
         # we only render if we have a location to put the version string
         # otherwise we have nothing to do
         if self.version_location:
-            text = 'v%s' % POLAR_WIND_PLOT_VERSION
-            width, height = self.draw.textsize(text, font=self.label_font)
-            if 'top' in self.version_location:
-                y = self.plot_border + height
-            else:
-                y = self.image_height - self.plot_border - height
-            if 'left' in self.version_location:
-                x = self.plot_border
-            elif ('center' in self.version_location) or ('centre' in self.version_location):
-                x = self.origin_x - width / 2
-            else:
-                x = self.image_width - self.plot_border - width
+            text = POLAR_WIND_PLOT_VERSION_TEXT
+            width, height = self._text_size(text, font=self.label_font)
+            x, y = self.get_label_xy(self.version_anchor, width, height)
             self.draw.text((x, y),
                            text,
                            fill=self.label_font_color,
                            font=self.label_font)
 
+    def get_label_xy(self, anchor, width, height):
+        """Get the plot coordinates of a timestamp, version or vector label.
+
+        Inputs:
+            anchor: tuple (vertical, horizontal) as returned by
+                    get_label_anchor()
+            width:  width of the label in pixels
+            height: height of the label in pixels
+
+        Returns:
+            a tuple (x, y) with the plot coordinates of the label
+        """
+
+        if anchor[0] == 'top':
+            y = self.plot_border + height
+        else:
+            y = self.image_height - self.plot_border - height
+        if anchor[1] == 'left':
+            x = self.plot_border
+        elif anchor[1] == 'centre':
+            x = self.origin_x - width / 2
+        else:
+            x = self.image_width - self.plot_border - width
+        return x, y
+
     def get_image(self):
         """Get an image object on which to render the plot."""
 
@@ -1045,11 +1256,26 @@ class PolarWindPlot(object):
                                self.image_background_color)
         else:
             try:
-                _b_image = Image.open(self.image_back_image)
-                _image = self.resize_image(_b_image,
-                                           self.image_width,
-                                           self.image_height)
-            except (IOError, AttributeError):
+                # Opening and resizing the background image is expensive and
+                # the same background is often used for many plots, so keep
+                # the resized image and give each plot a copy. Use the file
+                # modification time to pick up any change to the file. The
+                # cache is shared by all skins and the configured path is
+                # relative to the skin directory, so use the real path of the
+                # file.
+                _path = os.path.realpath(self.image_back_image)
+                _mtime = os.path.getmtime(_path)
+                _key = (_path, self.image_width,
+                        self.image_height, self.resample_filter)
+                _cached = _BACKGROUND_CACHE.get(_key)
+                if _cached is None or _cached[0] != _mtime:
+                    _b_image = Image.open(_path)
+                    _cached = (_mtime, self.resize_image(_b_image,
+                                                         self.image_width,
+                                                         self.image_height))
+                    _BACKGROUND_CACHE[_key] = _cached
+                _image = _cached[1].copy()
+            except (IOError, OSError, AttributeError):
                 _image = Image.new("RGB",
                                    (self.image_width, self.image_height),
                                    self.image_background_color)
@@ -1070,7 +1296,8 @@ class PolarWindPlot(object):
             # scale by height only
             # we will keep the aspect ratio so need to calc a target width
             tw = w * float(th/h)
-        return image.resize((tw, th), resample=self.resample_filter)
+        # Image.resize() requires integer dimensions
+        return image.resize((int(tw), int(th)), resample=self.resample_filter)
 
     def get_font_handles(self):
         """Get font handles for the fonts to be used."""
@@ -1085,6 +1312,42 @@ class PolarWindPlot(object):
         self.label_font = weeplot.utilities.get_font_handle(self.font_path,
                                                             self.label_font_size)
 
+    def _text_size(self, text, font):
+        """Get the size of some text when rendered in a given font.
+
+        The same strings (eg compass point labels) are measured several times
+        during a render so cache the results.
+
+        Returns:
+            a tuple (width, height) in pixels
+        """
+
+        _key = (text, font)
+        try:
+            return self._text_cache[_key]
+        except KeyError:
+            try:
+                # Use the font bounding box if available, it is cheaper than
+                # ImageDraw.textsize(), which is deprecated from Pillow 9.2
+                # and removed in Pillow 10.
+                _bbox = font.getbbox(text)
+                _size = (_bbox[2], _bbox[3])
+            except AttributeError:
+                # older PIL/Pillow without getbbox()
+                _size = self.draw.textsize(text, font=font)
+            self._text_cache[_key] = _size
+            return _size
+
+    def _twidth(self, text, font):
+        """Get the width in pixels of some text in a given font."""
+
+        return self._text_size(text, font)[0]
+
+    def _theight(self, text, font):
+        """Get the height in pixels of some text in a given font."""
+
+        return self._text_size(text, font)[1]
+
     def get_ring_label(self, ring):
         """Get the label to be displayed on the polar plot rings.
 
@@ -1118,36 +1381,42 @@ class PolarWindPlot(object):
             marker_color: Color to be used
         """
 
+        # local alias for our Draw object
+        draw = self.draw
+        # integer plot coords of the marker centre and bounding box, these are
+        # used by all marker types so calculate them once
+        xi = int(x)
+        yi = int(y)
+        left = int(x - size)
+        top = int(y - size)
+        right = int(x + size)
+        bottom = int(y + size)
         if marker_type == "cross":
-            line = (int(x - size), int(y), int(x + size), int(y))
-            self.draw.line(line, fill=marker_color, width=1)
-            line = (int(x), int(y - size), int(x), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
+            draw.line((left, yi, right, yi), fill=marker_color, width=1)
+            draw.line((xi, top, xi, bottom), fill=marker_color, width=1)
         elif marker_type == "x":
-            line = (int(x - size), int(y - size), int(x + size), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
-            line = (int(x + size), int(y - size), int(x - size), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
+            draw.line((left, top, right, bottom), fill=marker_color, width=1)
+            draw.line((right, top, left, bottom), fill=marker_color, width=1)
         elif marker_type == "box":
-            line = (int(x - size), int(y - size), int(x + size), int(y - size))
-            self.draw.line(line, fill=marker_color, width=1)
-            line = (int(x + size), int(y - size), int(x+size), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
-            line = (int(x - size), int(y - size), int(x - size), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
-            line = (int(x - size), int(y + size), int(x + size), int(y + size))
-            self.draw.line(line, fill=marker_color, width=1)
+            if left != right and top != bottom:
+                # draw the box outline in one go
+                draw.rectangle((left, top, right, bottom), outline=marker_color)
+            else:
+                # a box with zero width and/or height is just a line (or a
+                # point), draw.rectangle() over draws in this case so draw a
+                # line
+                draw.line((left, top, right, bottom),
+                          fill=marker_color, width=1)
         else:
             # dot or circle, use circle if it's an unsupported marker type
-            bbox = (int(x - size), int(y - size),
-                    int(x + size), int(y + size))
+            bbox = (left, top, right, bottom)
             if marker_type == "dot":
                 # a dot is just a filled circle
-                self.draw.ellipse(bbox, outline=marker_color, fill=marker_color)
+                draw.ellipse(bbox, outline=marker_color, fill=marker_color)
             else:
                 # either circle was specified or it is an unsupported marker
                 # type, either way use circle
-                self.draw.ellipse(bbox, outline=marker_color)
+                draw.ellipse(bbox, outline=marker_color)
 
     def join_curve(self, start_x, start_y, start_r, start_a,
                    end_x, end_y, end_r, end_a, color, line_width):
@@ -1169,6 +1438,9 @@ class PolarWindPlot(object):
             line_width : line width (pixels)
         """
 
+        # local aliases for frequently used properties
+        origin_x = self.origin_x
+        origin_y = self.origin_y
         # calculate the angle in degrees between the start and end vectors and
         # the 'direction of plotting'
         if (end_a - start_a) % 360 <= 180:
@@ -1180,34 +1452,63 @@ class PolarWindPlot(object):
             end = start_a
             direction = -1
         angle_span = (end - start) % 360
-        # initialise our start plot points
-        last_x = start_x
-        last_y = start_y
+        # if the angle to cover is 1 degree or less there are no intermediate
+        # points, the curve is a single segment so just draw it
+        if angle_span <= 1:
+            self.draw.line((start_x, start_y, end_x, end_y),
+                           fill=color, width=line_width)
+            return
+        # initialise the list of points on our curve with our start point, the
+        # curve will be drawn as a single polyline through these points
+        points = [(start_x, start_y)]
         a = 1
+        # If the start direction is a whole number of degrees (0 to 360) every
+        # point on the curve is at a whole number of degrees so we can use our
+        # sine and cosine tables rather than calculating them for each point.
+        whole_degrees = 0 <= start_a <= 360 and start_a == int(start_a)
+        if whole_degrees:
+            # index of the start direction in our tables
+            start_idx = int(start_a) + 360
+            sin_degrees = SIN_DEGREES
+            cos_degrees = COS_DEGREES
+        # local aliases for the math functions and constants used for each
+        # segment
+        _sin = math.sin
+        _cos = math.cos
+        deg_to_rad = DEG_TO_RAD
+        # the change in radius over the curve, if there is no change the
+        # radius is the same for every point
+        delta_r = end_r - start_r
+        radius = start_r
         # while statement to allow us to draw curve in 1 degree increments
-        # if angle to cover is < 2 degrees we draw NO segments
         while a < angle_span:
             # calculate the radius of the vector of next point we will draw to
-            radius = start_r + (end_r - start_r) * a / angle_span
+            if delta_r:
+                radius = start_r + delta_r * a / angle_span
+            if whole_degrees:
+                # look up the sine and cosine of the angle of the vector of
+                # the next point
+                idx = start_idx + a * direction
+                sin_a = sin_degrees[idx]
+                cos_a = cos_degrees[idx]
+            else:
+                # the angle of the vector of the next point in radians, it is
+                # used for both sine and cosine so calculate it once
+                theta = (start_a + (a * direction)) * deg_to_rad
+                sin_a = _sin(theta)
+                cos_a = _cos(theta)
             # get the x and y plot coords of the next point
-            x = int(self.origin_x + radius * math.sin(math.radians(start_a + (a * direction))))
-            y = int(self.origin_y - radius * math.cos(math.radians(start_a + (a * direction))))
-            # define the start and end points of the line between the current
-            # point to the last
-            xy = (last_x, last_y, x, y)
-            # draw a straight line
-            self.draw.line(xy, fill=color, width=line_width)
-            # save our current point as the last point
-            last_x = x
-            last_y = y
+            # add the x and y plot coords of the next point to our list
+            points.append((int(origin_x + radius * sin_a),
+                           int(origin_y - radius * cos_a)))
             # increment the angle
             a += 1
-        # once we have finished the curve (if any was plotted at all) we need
-        # to draw the last incremental point to our original end point. In
-        # instances when the angle_span is < 2 degrees this will be the only
-        # segment drawn
-        xy = (last_x, last_y, end_x, end_y)
-        self.draw.line(xy, fill=color, width=line_width)
+        # once we have finished the curve we need to add our original end
+        # point
+        points.append((end_x, end_y))
+        # draw the curve as a single polyline, we don't use a joint as that
+        # would change how the segments are drawn
+        self.draw.line(points, fill=color, width=line_width)
 
     @staticmethod
     def get_legend_title(source=None):
@@ -1225,11 +1526,13 @@ class PolarWindPlot(object):
 
         result = None
         if source == "speed":
-            # colour is a function of speed
-            for lookup in range(5, -1, -1):
-                if speed > self.speed_list[lookup]:
-                    result = self.plot_colors[lookup + 1]
-                    break
+            # Colour is a function of speed. The colour index is the number of
+            # speed range boundaries (excluding the top) that are less than
+            # the speed. A speed that does not exceed the lowest boundary has
+            # no colour.
+            lookup = bisect.bisect_left(self._speed_edges, speed)
+            if lookup > 0:
+                result = self.plot_colors[lookup]
         else:
             # constant colour
             result = source
@@ -1268,6 +1571,10 @@ class PolarWindRosePlot(PolarWindPlot):
             logdbg("Unsupported petal width '%d', using default '%d' instead" % (self.petal_width,
                                                                                  DEFAULT_PETAL_WIDTH))
             self.petal_width = DEFAULT_PETAL_WIDTH
+        # the arc in degrees covered by each petal position and half the arc
+        # of each drawn petal, these are fixed for the plot
+        self.petal_arc = 360.0 / self.petals
+        self.half_petal_arc = 180.0 * self.petal_width / self.petals
         # bullseye radius as a proportion of the plot area radius
         self.bullseye = float(plot_dict.get('bullseye', DEFAULT_BULLSEYE))
         if self.bullseye < 0.01 or self.bullseye > 1.0:
@@ -1276,8 +1583,12 @@ class PolarWindRosePlot(PolarWindPlot):
             self.bullseye = DEFAULT_BULLSEYE
         # initialise some properties for use later
         self.max_ring_val = None
+        self.ring_label_inc = None
         self.wind_bin = None
         self.ring_units = None
+        self.petal_start = None
+        self.petal_end = None
+        self.arm_sums = None
 
     def render(self, title):
         """Main entry point to generate a polar wind rose plot."""
@@ -1319,48 +1630,46 @@ class PolarWindRosePlot(PolarWindPlot):
         # Setup 2D list for wind direction. wind_bin[0] represents each of
         # 'petals' compass directions ([0] is N, increasing clockwise).
         # wind_bin[1] holds count of obs in a particular speed range for given
-        # direction
-        wind_bin = [[0 for x in range(7)] for x in range(self.petals + 1)]
-        # setup list to hold obs counts for each speed range
-        speed_bin = [0 for x in range(7)]
+        # direction. The counts are accumulated in a flat list indexed by
+        # direction bin * 7 + speed bin, this saves a level of list lookup per
+        # sample, and are then split into the 2D list.
+        flat_bin = [0] * (7 * self.petals)
+        # count of 'None' obs
+        none_count = 0
+        # local copies of values used for every sample
+        speed_edges = self._speed_edges
+        petals = self.petals
+        # direction bins are equal width so the bin can be calculated directly
+        # by scaling the direction, petal 0 is centred on North so offset by
+        # half a bin
+        inv_width = petals / 360.0
+        _bisect = bisect.bisect_left
         # Loop through each sample and increment direction counts and speed
         # ranges for each direction as necessary. 'None' direction is counted
         # as 'calm' (or 0 speed) and (by definition) no direction and are
         # plotted in the 'bullseye' on the plot.
-        for i in range(self.samples):
-            this_speed_vec = self.speed_vec.value[i]
-            this_dir_vec = self.dir_vec.value[i]
+        for this_speed_vec, this_dir_vec in six.moves.zip(self.speeds[:self.samples],
+                                                          self.dirs[:self.samples]):
             if (this_speed_vec is None) or (this_dir_vec is None):
-                wind_bin[self.petals][6] += 1
+                none_count += 1
             else:
-                bin = int((this_dir_vec + (180.0 / self.petals)) / (360.0 / self.petals)) % self.petals
-                if this_speed_vec > self.speed_list[5]:
-                    wind_bin[bin][6] += 1
-                elif this_speed_vec > self.speed_list[4]:
-                    wind_bin[bin][5] += 1
-                elif this_speed_vec > self.speed_list[3]:
-                    wind_bin[bin][4] += 1
-                elif this_speed_vec > self.speed_list[2]:
-                    wind_bin[bin][3] += 1
-                elif this_speed_vec > self.speed_list[1]:
-                    wind_bin[bin][2] += 1
-                elif this_speed_vec > 0:
-                    wind_bin[bin][1] += 1
-                else:
-                    wind_bin[bin][0] += 1
-        # add 'None' obs to 0 speed count
-        speed_bin[0] += wind_bin[self.petals][6]
-        # don't need the 'None' counts so we can delete them
-        del wind_bin[-1]
-        # Now set total (direction independent) speed counts. Loop through
-        # each petal speed range and increment direction independent speed
-        # ranges as necessary.
-        for j in range(7):
-            for i in range(self.petals):
-                speed_bin[j] += wind_bin[i][j]
+                bin = int(this_dir_vec * inv_width + 0.5) % petals
+                flat_bin[bin * 7 + _bisect(speed_edges, this_speed_vec)] += 1
+        # split our flat list into the 2D list
+        wind_bin = [flat_bin[i:i + 7] for i in range(0, 7 * petals, 7)]
+        # Now set total (direction independent) speed counts by summing each
+        # speed range across all petals, each speed range is every 7th element
+        # of our flat list. 'None' obs are added to the 0 speed count.
+        speed_bin = [sum(flat_bin[j::7]) for j in range(7)]
+        speed_bin[0] += none_count
         # Calc the value to represented by outer ring (range 0 to 1). Value to
         # rounded up to next multiple of 0.05 (ie next 5%)
-        self.max_ring_val = (int(max(sum(b) for b in wind_bin) / (0.05 * self.samples)) + 1) * 0.05
+        # first get the total number of samples in each arm, we use these
+        # totals a number of times
+        arm_sums = [sum(b) for b in wind_bin]
+        self.max_ring_val = (int(max(arm_sums) / (0.05 * self.samples)) + 1) * 0.05
+        # the increment in value between rings, used when labelling the rings
+        self.ring_label_inc = self.max_ring_val / self.rings
         # Find which wind rose arm to use to display ring range labels - look
         # for one that is relatively clear. Only consider NE, SE, SW and NW;
         # preference in order is SE, SW, NE and NW. label_dir stored as an
@@ -1375,7 +1684,7 @@ class PolarWindRosePlot(PolarWindPlot):
         label_dir = None
         for i in _dir_list:
             # is SW, NE or NW clear
-            if sum(wind_bin[i])/float(self.samples) <= 0.3 * self.max_ring_val:
+            if arm_sums[i]/float(self.samples) <= 0.3 * self.max_ring_val:
                 # it's clear so take it
                 label_dir = _dict[i]
                 # we have finished looking so exit the for loop
@@ -1388,78 +1697,108 @@ class PolarWindRosePlot(PolarWindPlot):
             for i in _dir_list:
                 # if this direction has fewer obs than previous best then
                 # remember it
-                if sum(wind_bin[i]) < label_count:
+                if arm_sums[i] < label_count:
                     # set min count so far to this bin
-                    label_count = sum(wind_bin[i])
+                    label_count = arm_sums[i]
                     # set label_dir to this direction
                     label_dir = _dict[i]
         self.label_dir = label_dir
         # save wind_bin, we need it later to render the rose plot
         self.wind_bin = wind_bin
         self.speed_bin = speed_bin
+        # the total of all speed bins is used when calculating percentages so
+        # calculate it once
+        self.speed_bin_total = sum(speed_bin)
+        # save the per-arm totals, we need them to render the rose plot
+        self.arm_sums = arm_sums
         # 'units' to use on ring labels
         self.ring_units = '%'
+        # The start and end angles of the pie slices that make up each petal
+        # depend only on the number of petals and the petal width so calculate
+        # them once for each petal.
+        _half_petal_arc = self.half_petal_arc
+        petal_arc = self.petal_arc
+        self.petal_start = [int(a * petal_arc - 90 - _half_petal_arc) for a in range(self.petals)]
+        self.petal_end = [int(a * petal_arc - 90 + _half_petal_arc) for a in range(self.petals)]
 
     def render_plot(self):
         """Render the rose plot data."""
 
+        # local aliases for frequently used properties
+        draw = self.draw
+        origin_x = self.origin_x
+        origin_y = self.origin_y
         # calculate the bullseye radius in pixels
-        b_radius = self.bullseye * self.max_plot_dia / 2.0
+        b_radius = self.bullseye * self.plot_radius
         # calculate the space left in which to plot the rose 'petals'
-        petal_space = self.max_plot_dia / 2.0 - b_radius
-
-        _half_petal_arc = 180.0 * self.petal_width / self.petals
+        petal_space = self.plot_radius - b_radius
 
         # Plot wind rose petals. Each petal is constructed from overlapping
         # pie slices starting from outside (biggest) and working in (smallest)
         # start at 'North' windrose petal
 
+        # local copies of values used for every pie slice
+        plot_colors = self.plot_colors
+        ring_total = self.max_ring_val * self.samples
+        top_bin = len(self.speed_list) - 1
+        arm_sums = self.arm_sums
+        petal_start = self.petal_start
+        petal_end = self.petal_end
+        pieslice = draw.pieslice
+
         # loop through each wind rose arm
-        for a in range(len(self.wind_bin)):
-            # calculate the sum of all samples for this arm
-            arm_sum = sum(self.wind_bin[a])
+        for a, arm_bin in enumerate(self.wind_bin):
+            # the sum of all samples for this arm
+            arm_sum = arm_sums[a]
             # we only need to do something if we have data to plot
             if arm_sum > 0:
+                # the start and end angles of the pie slices for this arm are
+                # the same for every bin
+                start_angle = petal_start[a]
+                end_angle = petal_end[a]
+                # calc radius in pixels of the outermost pie slice
+                radius = int(b_radius + arm_sum / ring_total * petal_space)
                 # loop through each of the bins that make up this arm, start at
                 # the outermost (highest) and work our way in
-                for s in range(len(self.speed_list) - 1, 0, -1):
-                    # calc radius in pixels of the pie slice that represents
-                    # the current bin
-                    proportion = arm_sum / (self.max_ring_val * self.samples)
-                    radius = int(b_radius + proportion * petal_space)
-                    # set bound box for pie slice
-                    bbox = (self.origin_x - radius,
-                            self.origin_y - radius,
-                            self.origin_x + radius,
-                            self.origin_y + radius)
-                    # draw pie slice
-                    self.draw.pieslice(bbox,
-                                       int(a * (360.0/self.petals) - 90 - _half_petal_arc),
-                                       int(a * (360.0/self.petals) - 90 + _half_petal_arc),
-                                       fill=self.plot_colors[s], outline='black')
+                for s in range(top_bin, 0, -1):
                     # finished with this bin, so reduce our arm sum by the bin
-                    # we just plotted
-                    arm_sum -= self.wind_bin[a][s]
+                    # we are plotting and calc the radius in pixels of the
+                    # next (inner) pie slice
+                    arm_sum -= arm_bin[s]
+                    next_radius = int(b_radius + arm_sum / ring_total * petal_space) if s > 1 else None
+                    # If the next pie slice has the same radius it will
+                    # completely cover this pie slice (eg if this bin is
+                    # empty) so there is no need to draw this pie slice.
+                    if radius != next_radius:
+                        # set bound box for pie slice
+                        bbox = (origin_x - radius,
+                                origin_y - radius,
+                                origin_x + radius,
+                                origin_y + radius)
+                        # draw pie slice
+                        pieslice(bbox, start_angle, end_angle,
+                                 fill=plot_colors[s], outline='black')
+                    radius = next_radius
 
         # draw 'bullseye' to represent windSpeed=0 or calm
         # produce the label
-        label0 = str(int(round(100.0 * self.speed_bin[0] / sum(self.speed_bin), 0))) + '%'
+        label0 = str(int(round(100.0 * self.speed_bin[0] / self.speed_bin_total, 0))) + '%'
         # work out its size, particularly its width
-        text_width, text_height = self.draw.textsize(label0, font=self.plot_font)
+        text_width, text_height = self._text_size(label0, self.plot_font)
         # size the bound box
-        bbox = (int(self.origin_x - b_radius),
-                int(self.origin_y - b_radius),
-                int(self.origin_x + b_radius),
-                int(self.origin_y + b_radius))
+        bbox = (int(origin_x - b_radius),
+                int(origin_y - b_radius),
+                int(origin_x + b_radius),
+                int(origin_y + b_radius))
         # draw the circle
-        self.draw.ellipse(bbox,
-                          outline='black',
-                          fill=self.plot_colors[0])
+        draw.ellipse(bbox,
+                     outline='black',
+                     fill=self.plot_colors[0])
         # display the value
-        self.draw.text((int(self.origin_x-text_width / 2), int(self.origin_y - text_height / 2)),
-                       label0,
-                       fill=self.plot_font_color,
-                       font=self.plot_font)
+        draw.text((int(origin_x-text_width / 2), int(origin_y - text_height / 2)),
+                  label0,
+                  fill=self.plot_font_color,
+                  font=self.plot_font)
 
     def get_ring_label(self, ring):
         """Get the label to be displayed on the polar plot rings.
@@ -1479,9 +1818,7 @@ class PolarWindRosePlot(PolarWindPlot):
         """
 
         if ring > 1:
-            label_inc = self.max_ring_val / self.rings
-            return ''.join([str(int(round(label_inc * ring * 100, 0))),
-                            self.ring_units])
+            return str(int(round(self.ring_label_inc * ring * 100, 0))) + self.ring_units
         else:
             return None
 
@@ -1554,6 +1891,12 @@ class PolarWindScatterPlot(PolarWindPlot):
         self.oldest_color = parse_color(_oldest_color, '#F7FAFF')
         _newest_color = plot_dict.get('newest_color')
         self.newest_color = parse_color(_newest_color, '#00368E')
+        # Get the number of colours to use in an 'age' based line colour
+        # transition. The default (None) uses a unique colour for each sample.
+        # Fewer colours allow consecutive lines of the same colour to be drawn
+        # together.
+        _steps = int(plot_dict.get('age_color_steps', 0))
+        self.age_color_steps = _steps if _steps > 1 else None
 
         # get axis label format
         self.ring_label_time_format = plot_dict.get('ring_label_time_format',
@@ -1609,10 +1952,9 @@ class PolarWindScatterPlot(PolarWindPlot):
 
         # initialise a list to holds the sample counts for quadrant 0 to 3
         quadrant_count = [0 for x in range(4)]
-        # iterate over our samples assigning each to a particular quadrant
-        for i in range(0, self.samples):
-            # get the direction element of the sample
-            _dir = self.dir_vec.value[i]
+        # iterate over the direction of each of our samples assigning each to
+        # a particular quadrant
+        for _dir in self.dirs[:self.samples]:
             # increment the count for the quadrant that will contain the sample
             # but be careful as the sample's direction could be None
             if _dir is not None:
@@ -1634,69 +1976,109 @@ class PolarWindScatterPlot(PolarWindPlot):
     def render_plot(self):
         """Render the scatter plot."""
 
+        # local alias for our Draw object
+        draw = self.draw
         # do we need to plot anything
         if self.line_type is not None or self.marker_type is not None:
             # radius of plot area in pixels
-            plot_radius = self.max_plot_dia / 2
+            plot_radius = self.plot_radius
             # initialise values for the last plot point, use None as there is
             # no last point the first time around
             last_x = last_y = last_dir = last_radius = None
+            # local copies of values used for every sample
+            origin_x = self.origin_x
+            origin_y = self.origin_y
+            max_speed_range = self.max_speed_range
+            line_type = self.line_type
+            line_width = self.line_width
+            marker_type = self.marker_type
+            marker_size = self.marker_size
+            age_line_color = self.line_color == 'age'
+            fixed_line_color = self.line_color
+            join_curve = self.join_curve
+            render_marker = self.render_marker
+            # cache of sin and cos for each bearing plotted
+            trig = BearingTrig()
+            # if the line colour is age based calculate the transition colour
+            # for each sample in one go
+            if age_line_color and self.samples > 1:
+                steps = self.age_color_steps
+                if steps is not None and steps < self.samples:
+                    # we are using a limited number of colours, calculate
+                    # each colour and then allocate samples to each colour
+                    # in turn
+                    palette = color_trans_list(self.oldest_color,
+                                               self.newest_color,
+                                               [k / (steps - 1.0) for k in range(steps)])
+                    age_colors = [palette[i * steps // self.samples] for i in range(self.samples)]
+                else:
+                    age_colors = color_trans_list(self.oldest_color,
+                                                  self.newest_color,
+                                                  [i / (self.samples - 1.0) for i in range(self.samples)])
+            # straight lines without markers are drawn as polylines, markers
+            # require each line to be drawn in turn over the previous marker
+            polyline = line_type == "straight" and marker_type is None
+            # the polyline we add points to
+            run = Polyline(draw, line_width)
+            # we only plot samples that have values for speed and dir, so get
+            # these samples (and their index) before we start plotting
+            plot_samples = [sample for sample in six.moves.zip(range(0, self.samples),
+                                                               self.speeds,
+                                                               self.dirs)
+                            if sample[1] is not None and sample[2] is not None]
             # iterate over the samples
-            for i in range(0, self.samples):
-                this_dir_vec = self.dir_vec.value[i]
-                this_speed_vec = self.speed_vec.value[i]
-                # we only plot if we have values for speed and dir
-                if this_speed_vec is not None and this_dir_vec is not None:
-                    # calculate the 'radius' in pixels of the vector
-                    # representing the sample to be plotted
-                    this_radius = plot_radius * this_speed_vec / self.max_speed_range
-                    # calculate the x and y coords of the sample to be plotted
-                    x = int(self.origin_x + this_radius * math.sin(math.radians(this_dir_vec)))
-                    y = int(self.origin_y - this_radius * math.cos(math.radians(this_dir_vec)))
-                    # if this is the first sample we can skip it as we have
-                    # nothing to plot from
-                    if last_radius is not None:
-                        # determine the line color to be used
-                        if self.line_color == 'age':
-                            # color is dependent on the age of the sample so
-                            # calculate a transition color
-                            line_color = color_trans(self.oldest_color,
-                                                     self.newest_color,
-                                                     i / (self.samples - 1.0))
-                        else:
-                            # fixed line color
-                            line_color = self.line_color
-                        # draw the line, line type can be 'straight', 'spoke',
-                        # 'radial' or no line
-                        if self.line_type == "straight":
-                            xy = (last_x, last_y, x, y)
-                            self.draw.line(xy, fill=line_color, width=self.line_width)
-                        elif self.line_type == "spoke":
-                            spoke = (self.origin_x, self.origin_y, x, y)
-                            self.draw.line(spoke, fill=line_color, width=self.line_width)
-                        elif self.line_type == "radial":
-                            self.join_curve(last_x, last_y, last_radius, last_dir,
-                                            x, y, this_radius, this_dir_vec,
-                                            line_color, self.line_width)
-                        # do we need to plot a marker
-                        if self.marker_type is not None:
-                            # we do, so get the colour, it's based on a
-                            # transition or is fixed
-                            if self.line_color == 'age':
-                                marker_color = color_trans(self.oldest_color,
-                                                           self.newest_color,
-                                                           i / (self.samples - 1.0))
-                            else:
-                                marker_color = self.line_color
-                            # now draw the marker
-                            self.render_marker(x, y, self.marker_size,
-                                               self.marker_type, marker_color)
-                    # this sample is complete, save the plot values as the
-                    # 'last' sample
-                    last_x = x
-                    last_y = y
-                    last_dir = this_dir_vec
-                    last_radius = this_radius
+            for i, this_speed_vec, this_dir_vec in plot_samples:
+                # calculate the 'radius' in pixels of the vector
+                # representing the sample to be plotted
+                this_radius = plot_radius * this_speed_vec / max_speed_range
+                # get the sin and cos of the bearing from our cache
+                sin_d, cos_d = trig[this_dir_vec]
+                # calculate the x and y coords of the sample to be plotted
+                x = int(origin_x + this_radius * sin_d)
+                y = int(origin_y - this_radius * cos_d)
+                # if this is the first sample we can skip it as we have
+                # nothing to plot from
+                if last_radius is not None:
+                    # determine the line color to be used
+                    if age_line_color:
+                        # color is dependent on the age of the sample so
+                        # use the transition color for this sample
+                        line_color = age_colors[i]
+                    else:
+                        # fixed line color
+                        line_color = fixed_line_color
+                    # draw the line, line type can be 'straight', 'spoke',
+                    # 'radial' or no line
+                    if polyline:
+                        run.add((x, y), line_color)
+                    elif line_type == "straight":
+                        xy = (last_x, last_y, x, y)
+                        draw.line(xy, fill=line_color, width=line_width)
+                    elif line_type == "spoke":
+                        spoke = (origin_x, origin_y, x, y)
+                        draw.line(spoke, fill=line_color, width=line_width)
+                    elif line_type == "radial":
+                        join_curve(last_x, last_y, last_radius, last_dir,
+                                   x, y, this_radius, this_dir_vec,
+                                   line_color, line_width)
+                    # do we need to plot a marker
+                    if marker_type is not None:
+                        # we do, the marker colour is the same as the line
+                        # colour so draw the marker
+                        render_marker(x, y, marker_size,
+                                      marker_type, line_color)
+                elif polyline:
+                    # the first point plotted starts the first polyline
+                    run.start((x, y))
+                # this sample is complete, save the plot values as the
+                # 'last' sample
+                last_x = x
+                last_y = y
+                last_dir = this_dir_vec
+                last_radius = this_radius
+            # draw any remaining polyline
+            if polyline:
+                run.flush()
 
     def get_ring_label(self, ring):
         """Get the label to be displayed on the polar plot rings.
@@ -1716,7 +2098,7 @@ class PolarWindScatterPlot(PolarWindPlot):
         """
 
         label_inc = self.max_speed_range / self.rings
-        return ''.join([str(int(round(label_inc * ring, 0))), self.ring_units])
+        return str(int(round(label_inc * ring, 0))) + self.ring_units
 
 
 # =============================================================================
@@ -1783,6 +2165,9 @@ class PolarWindSpiralPlot(PolarWindPlot):
         # get axis label format
         self.ring_label_time_format = plot_dict.get('ring_label_time_format',
                                                     DEFAULT_RING_LABEL_TIME_FORMAT)
+        # set some properties to startup defaults
+        self.radius_step = None
+        self.ring_samples = None
 
     def render(self, title):
         """Main entry point to generate a spiral polar wind plot."""
@@ -1835,13 +2220,30 @@ class PolarWindSpiralPlot(PolarWindPlot):
         # Use the default SE quadrant
         self.label_dir = 1
 
+        # Samples are equally spaced along the spiral radius so calculate the
+        # radial distance in pixels between successive samples.
+        if self.samples > 1:
+            self.radius_step = self.plot_radius / (self.samples - 1.0)
+        else:
+            self.radius_step = 0.0
+
+        # Determine which sample falls on each ring (ring 0 being the origin).
+        # The ring and spiral direction labels show the timestamp of these
+        # samples.
+        if self.centre == "newest":
+            self.ring_samples = [int(round((self.samples - 1) * (self.rings - ring) / self.rings))
+                                 for ring in range(self.rings + 1)]
+        else:
+            self.ring_samples = [int(round((self.samples - 1) * ring / self.rings))
+                                 for ring in range(self.rings + 1)]
+
     def render_plot(self):
         """Render the spiral plot."""
 
+        # local alias for our Draw object
+        draw = self.draw
         # do we need to plot anything
         if self.line_type is not None or self.marker_type is not None:
-            # radius of plot area in pixels
-            plot_radius = self.max_plot_dia / 2
             # we start from the origin so set our 'last' values
             last_x = self.origin_x
             last_y = self.origin_y
@@ -1853,51 +2255,80 @@ class PolarWindSpiralPlot(PolarWindPlot):
                 start, stop, step = self.samples-1, -1, -1
             else:
                 start, stop, step = 0, self.samples, 1
+            # local copies of values used for every sample
+            origin_x = self.origin_x
+            origin_y = self.origin_y
+            newest = self.centre == "newest"
+            last_sample = self.samples - 1
+            dirs = self.dirs
+            speeds = self.speeds
+            line_type = self.line_type
+            line_width = self.line_width
+            line_color_source = self.line_color
+            marker_type = self.marker_type
+            marker_size = self.marker_size
+            join_curve = self.join_curve
+            render_marker = self.render_marker
+            get_speed_color = self.get_speed_color
+            radius_step = self.radius_step
+            # cache of sin and cos for each bearing plotted
+            trig = BearingTrig()
+            # straight lines without markers are drawn as polylines, markers
+            # require each line to be drawn in turn over the previous marker
+            polyline = line_type == "straight" and marker_type is None
+            # integer plot coords of the last point for straight lines
+            last_point = (int(last_x), int(last_y))
+            # the polyline we add points to, it starts at the origin
+            run = Polyline(draw, line_width, last_point)
+            # We only plot samples that have a direction, so get the indices
+            # of these samples in the order they are to be plotted. This saves
+            # checking each sample in the plot loop.
+            plot_samples = [i for i in range(start, stop, step) if dirs[i] is not None]
             # iterate over the samples starting from the centre of the spiral
-            for i in range(start, stop, step):
-                this_dir_vec = self.dir_vec.value[i]
-                this_speed_vec = self.speed_vec.value[i]
-                # Calculate radius for this sample. Note assumes equal time periods
-                # between samples
-                if self.centre == "newest":
-                    scale = self.samples - 1 - i
-                else:
-                    scale = i
+            for i in plot_samples:
+                this_dir_vec = dirs[i]
+                this_speed_vec = speeds[i]
+                # Calculate radius for this sample. Note assumes equal time
+                # periods between samples
+                scale = last_sample - i if newest else i
                 # TODO. radius should be a function of time so as to better cope with gaps in data
-                this_radius = scale * plot_radius/(self.samples - 1) if self.samples > 1 else 0.0
-                # if the current direction sample is not None then plot it
-                # otherwise skip it
-                if this_dir_vec is not None:
-                    # bearing for this sample
-                    this_dir = int(this_dir_vec)
-                    # calculate plot coords for this sample
-                    x = self.origin_x + this_radius * math.sin(math.radians(this_dir_vec))
-                    y = self.origin_y - this_radius * math.cos(math.radians(this_dir_vec))
-                    # determine line color to be used
-                    line_color = self.get_speed_color(self.line_color,
-                                                      this_speed_vec)
-                    # draw the line; line type can be 'straight', 'radial' or None
-                    # for no line
-                    if self.line_type == "straight":
-                        vector = (int(last_x), int(last_y), int(x), int(y))
-                        self.draw.line(vector, fill=line_color, width=self.line_width)
-                    elif self.line_type == "radial":
-                        self.join_curve(last_x, last_y, last_radius, last_dir,
-                                        x, y, this_radius, this_dir,
-                                        line_color, self.line_width)
-                    # do we need to plot a marker
-                    if self.marker_type is not None:
-                        # we do, so get the colour, it's based on speed
-                        marker_color = self.get_speed_color(self.line_color,
-                                                            this_speed_vec)
-                        # now draw the marker
-                        self.render_marker(x, y, self.marker_size,
-                                           self.marker_type, marker_color)
-                    # this sample is complete, save it as the 'last' sample
-                    last_x = x
-                    last_y = y
-                    last_dir = this_dir
-                    last_radius = this_radius
+                this_radius = scale * radius_step
+                # bearing for this sample
+                this_dir = int(this_dir_vec)
+                # get the sin and cos of the bearing from our cache
+                sin_d, cos_d = trig[this_dir_vec]
+                # calculate plot coords for this sample
+                x = origin_x + this_radius * sin_d
+                y = origin_y - this_radius * cos_d
+                # determine line color to be used
+                line_color = get_speed_color(line_color_source, this_speed_vec)
+                # draw the line; line type can be 'straight', 'radial' or None
+                # for no line
+                if polyline:
+                    run.add((int(x), int(y)), line_color)
+                elif line_type == "straight":
+                    # PIL needs integer coords, convert each point once
+                    point = (int(x), int(y))
+                    draw.line(last_point + point, fill=line_color, width=line_width)
+                    last_point = point
+                elif line_type == "radial":
+                    join_curve(last_x, last_y, last_radius, last_dir,
+                               x, y, this_radius, this_dir,
+                               line_color, line_width)
+                # do we need to plot a marker
+                if marker_type is not None:
+                    # we do, the marker colour is the same as the line
+                    # colour so draw the marker
+                    render_marker(x, y, marker_size,
+                                  marker_type, line_color)
+                # this sample is complete, save it as the 'last' sample
+                last_x = x
+                last_y = y
+                last_dir = this_dir
+                last_radius = this_radius
+            # draw any remaining polyline
+            if polyline:
+                run.flush()
 
     def get_ring_label(self, ring):
         """Get the label to be displayed on the polar plot rings.
@@ -1916,14 +2347,9 @@ class PolarWindSpiralPlot(PolarWindPlot):
             label text for the given ring number
         """
 
-        # determine which sample will fall on the specified ring and extract
-        # its timestamp
-        if self.centre == "newest":
-            sample = int(round((self.samples - 1) * (self.rings - ring) / self.rings))
-        else:
-            sample = int(round((self.samples - 1) * ring / self.rings))
-        # get the sample ts as a datetime object
-        _dt = datetime.datetime.fromtimestamp(self.time_vec.value[sample])
+        # get the ts of the sample that falls on the specified ring as a
+        # datetime object
+        _dt = datetime.datetime.fromtimestamp(self.times[self.ring_samples[ring]])
         # return the formatted time
         return _dt.strftime(self.ring_label_time_format).strip()
 
@@ -1939,7 +2365,7 @@ class PolarWindSpiralPlot(PolarWindPlot):
             # oldest in the center, include the date of the oldest
             _label_text = "Oldest (%s) in center" % (self.get_ring_label(0))
         # get the size of the label
-        width, height = self.draw.textsize(_label_text, font=self.label_font)
+        width, height = self._text_size(_label_text, font=self.label_font)
         # Now locate the label. We follow the vertical location of the
         # timestamp label but we render on the opposite side of the plot so we
         # do not overwrite the timestamp label. If there is no timestamp label
@@ -2064,15 +2490,23 @@ class PolarWindTrailPlot(PolarWindPlot):
         elif _vec_loc & {'right'} and self.timestamp_location & {'right'}:
             _h_align = {'left'}
         self.vector_location = _v_align | _h_align
+        # resolve the vector location to a single vertical and horizontal
+        # anchor, we only need to do this once
+        self.vector_anchor = get_label_anchor(self.vector_location)
 
         # get size of the arc to be kept clear for ring labels
         self.ring_label_clear_arc = plot_dict.get('ring_label_clear_arc', 30)
         # set some properties to startup defaults
         self.max_vector_radius = None
+        self.ring_label_inc = None
         self.ring_units = None
         self.factor = None
         self.vector_x = None
         self.vector_y = None
+        self.trail_idx = None
+        self.trail_color = None
+        self.trail_x = None
+        self.trail_y = None
 
     def render(self, title):
         """Main entry point to generate a polar wind trail plot."""
@@ -2118,38 +2552,71 @@ class PolarWindTrailPlot(PolarWindPlot):
         """
 
         # To scale the wind trail to fit the plot area we need to know how big
-        # the vector will be. We do this by doing a dry run just calculating
-        # the overall vector.
+        # the vector will be. We do this by calculating the running (cumulative)
+        # vector for each sample. The running vectors are kept so they can be
+        # reused when the plot is rendered.
         self.max_vector_radius = 0
         vec_x = 0
         vec_y = 0
+        # lists of sample index, speed based colour and running vector x and y
+        # components for each sample that contributes to the trail
+        trail_idx = []
+        trail_color = []
+        trail_x = []
+        trail_y = []
         # how we calculate distance depends on the speed units in use
         if self.speed_vec.unit == 'meter_per_second' or self.speed_vec.unit == 'meter_per_second':
             self.factor = 1000.0
         else:
             self.factor = 3600.0
+        # local copies of values used for every sample
+        speeds = self.speeds
+        dirs = self.dirs
+        times = self.times
+        factor = self.factor
+        # cache of sin and cos for each direction, wind directions often
+        # repeat so this saves recalculating them
+        trig = BearingTrig()
         # iterate over the samples, ignore the first since we don't know what
         # period (delta) it applies to
         for i in range(1, self.samples):
-            this_dir_vec = self.dir_vec.value[i]
-            this_speed_vec = self.speed_vec.value[i]
+            this_dir_vec = dirs[i]
+            this_speed_vec = speeds[i]
             # ignore any speeds that are 0 or None and any directions that are
             # None
             if this_speed_vec is None or this_dir_vec is None or this_speed_vec == 0.0:
                 continue
             # the period in sec the current speed applies to
-            delta = self.time_vec.value[i] - self.time_vec.value[i-1]
+            delta = times[i] - times[i-1]
             # the corresponding distance
-            dist = this_speed_vec * delta / self.factor
-            # calculate new vector from centre for this point
-            vec_x += dist * math.sin(math.radians((this_dir_vec + 180) % 360))
-            vec_y += dist * math.cos(math.radians((this_dir_vec + 180) % 360))
-            vec_radius = math.sqrt(vec_x**2 + vec_y**2)
+            dist = this_speed_vec * delta / factor
+            # Calculate new vector from centre for this point. The vector
+            # points in the direction the wind is blowing to, which is 180
+            # degrees from the wind direction. Rather than adding 180 degrees
+            # to the direction we can simply subtract the components, since
+            # sin(a + 180) = -sin(a) and cos(a + 180) = -cos(a).
+            sin_d, cos_d = trig[this_dir_vec]
+            vec_x -= dist * sin_d
+            vec_y -= dist * cos_d
+            vec_radius = math.hypot(vec_x, vec_y)
             if vec_radius > self.max_vector_radius:
                 self.max_vector_radius = vec_radius
+            # save the running vector for this sample
+            trail_idx.append(i)
+            trail_color.append(self.get_speed_color('speed', this_speed_vec))
+            trail_x.append(vec_x)
+            trail_y.append(vec_y)
+        # save the running vectors, we need them later to render the trail
+        self.trail_idx = trail_idx
+        self.trail_color = trail_color
+        self.trail_x = trail_x
+        self.trail_y = trail_y
         # store the resulting x and y components for an overall vector statement
         self.vector_x = vec_x
         self.vector_y = vec_y
+        # the increment in distance between rings, used when labelling the
+        # rings
+        self.ring_label_inc = self.max_vector_radius / self.rings
 
         # Determine which quadrant will contain the ring labels. Ring labels
         # are displayed on a 45 degree radial in one of the 4 quadrants.
@@ -2188,84 +2655,104 @@ class PolarWindTrailPlot(PolarWindPlot):
     def render_plot(self):
         """Render the trail plot."""
 
+        # local alias for our Draw object
+        draw = self.draw
         # do we need to plot anything
         if (self.line_type is not None or self.marker_type is not None) \
                 and self.max_vector_radius > 0.0:
             # radius of plot area in pixels
-            plot_radius = self.max_plot_dia / 2
+            plot_radius = self.plot_radius
             # scaling to be applied to calculated vectors
             scale = plot_radius / self.max_vector_radius
-            # for the first sample the vector components must be set to 0 and the
-            # previous point must be set to the origin
-            vec_x = 0
-            vec_y = 0
+            # for the first sample the previous point must be set to the
+            # origin
             last_x = self.origin_x
             last_y = self.origin_y
-            if self.dir_vec.value[0] is None:
+            if self.dirs[0] is None:
                 last_dir = 0
             else:
-                last_dir = int((self.dir_vec.value[0] + 180) % 360)
+                last_dir = int((self.dirs[0] + 180) % 360)
             last_radius = 0
-            # iterate over the samples, ignore the first since we don't know what
-            # period (delta) it applies to
-            for i in range(1, self.samples):
-                this_dir_vec = self.dir_vec.value[i]
-                this_speed_vec = self.speed_vec.value[i]
-                # ignore any speeds that are 0 or None and any directions that are None
-                if this_speed_vec is None or this_dir_vec is None or this_speed_vec == 0.0:
-                    continue
-                # the period in sec the current speed applies to
-                delta = self.time_vec.value[i] - self.time_vec.value[i - 1]
-                # the corresponding distance
-                dist = this_speed_vec * delta / self.factor
-                # calculate new running vector from centre for this point
-                vec_x += dist * math.sin(math.radians((this_dir_vec + 180) % 360))
-                vec_y += dist * math.cos(math.radians((this_dir_vec + 180) % 360))
-                # scale the vector to our polar plot area
-                x = self.origin_x + vec_x * scale
-                y = self.origin_y - vec_y * scale
-                this_radius = math.sqrt(vec_x**2 + vec_y**2) * scale
-                this_dir = math.degrees(math.atan2(-vec_y, vec_x)) + 90.0
-                # determine line color to be used
-                line_color = self.get_speed_color(self.line_color,
-                                                  this_speed_vec)
+            # local copies of values used for every sample
+            origin_x = self.origin_x
+            origin_y = self.origin_y
+            line_type = self.line_type
+            line_width = self.line_width
+            last_sample = self.samples - 1
+            # are the line and marker colours speed based or fixed
+            speed_line_color = self.line_color == 'speed'
+            speed_marker_color = self.marker_color == 'speed'
+            # local aliases for the math functions used for every sample
+            _hypot = math.hypot
+            _atan2 = math.atan2
+            _degrees = math.degrees
+            # scale the running vectors calculated in set_plot() to our polar
+            # plot area, this saves recalculating the vector for each sample
+            plot_x = [origin_x + vec_x * scale for vec_x in self.trail_x]
+            plot_y = [origin_y - vec_y * scale for vec_y in self.trail_y]
+            # integer plot coords of the last point for straight lines
+            last_point = (int(last_x), int(last_y))
+            # straight lines without markers are drawn as polylines, markers
+            # require each line to be drawn in turn over the previous marker
+            polyline = line_type == 'straight' and self.marker_type is None
+            # the polyline we add points to, it starts at the origin
+            run = Polyline(draw, line_width, last_point)
+            # iterate over the trail samples
+            for i, speed_color, vec_x, vec_y, x, y in six.moves.zip(self.trail_idx,
+                                                                    self.trail_color,
+                                                                    self.trail_x,
+                                                                    self.trail_y,
+                                                                    plot_x,
+                                                                    plot_y):
+                # determine line color to be used, the speed based colour for
+                # this sample was determined in set_plot()
+                line_color = speed_color if speed_line_color else self.line_color
                 # draw the line, line type can be 'straight', 'radial' or no line
-                if self.line_type == 'straight':
-                    vector = (int(last_x), int(last_y), int(x), int(y))
-                    self.draw.line(vector, fill=line_color, width=self.line_width)
-                elif self.line_type == "radial":
+                if polyline:
+                    run.add((int(x), int(y)), line_color)
+                elif line_type == 'straight':
+                    # PIL needs integer coords, convert each point once
+                    point = (int(x), int(y))
+                    draw.line(last_point + point, fill=line_color, width=line_width)
+                    last_point = point
+                elif line_type == "radial":
+                    # a radial line needs the polar coords of the point, these
+                    # are only needed for radial lines
+                    this_radius = _hypot(vec_x, vec_y) * scale
+                    this_dir = _degrees(_atan2(-vec_y, vec_x)) + 90.0
                     self.join_curve(last_x, last_y, last_radius, last_dir,
                                     x, y, this_radius, this_dir,
-                                    line_color, self.line_width)
+                                    line_color, line_width)
+                    last_dir = this_dir
+                    last_radius = this_radius
                 # do we need to plot a marker
                 if self.marker_type is not None:
                     # we do, so get the colour, it's based on speed
-                    marker_color = self.get_speed_color(self.marker_color,
-                                                        this_speed_vec)
+                    marker_color = speed_color if speed_marker_color else self.marker_color
                     # if this is the last point make it a different colour if
                     # needed
-                    if i == self.samples - 1:
+                    if i == last_sample:
                         if self.end_point_color:
                             marker_color = self.end_point_color
                     # now draw the marker
                     self.render_marker(x, y, self.marker_size, self.marker_type, marker_color)
                 last_x = x
                 last_y = y
-                last_dir = this_dir
-                last_radius = this_radius
+            # draw any remaining polyline
+            if polyline:
+                run.flush()
             # that's the last sample done, now we draw final vector if required
             if self.vector_color is not None:
-                vector = (int(self.origin_x), int(self.origin_y), int(x), int(y))
-                self.draw.line(vector,
-                               fill=self.vector_color,
-                               width=self.line_width)
+                vector = (int(self.origin_x), int(self.origin_y), int(plot_x[-1]), int(plot_y[-1]))
+                draw.line(vector,
+                          fill=self.vector_color,
+                          width=self.line_width)
 
     def render_vector(self):
         """Render a statement of the net plotted windrun vector."""
 
         # obtain the net windrun vector magnitude and direction
-        _mag = int(round(math.sqrt(self.vector_x**2 + self.vector_y**2),
-                         0))
+        _mag = int(round(math.hypot(self.vector_x, self.vector_y), 0))
         # we need to do a little translation to map from PIL vector coords to
         # compass vector coords
         _dir = round(math.degrees(math.atan2(self.vector_x, self.vector_y)),
@@ -2284,21 +2771,12 @@ class PolarWindTrailPlot(PolarWindPlot):
                                                            DEGREE_SYMBOL,
                                                            _ord_dir)
         # determine the size
-        _width, _height = self.draw.textsize(_vector_text,
-                                             font=self.label_font)
+        _width, _height = self._text_size(_vector_text,
+                                          font=self.label_font)
 
         # now find the location we are to use, we should already be
         # deconflicted with the timestamp location
-        if 'top' in self.vector_location:
-            y = self.plot_border + _height
-        else:
-            y = self.image_height - self.plot_border - _height
-        if 'left' in self.vector_location:
-            x = self.plot_border
-        elif ('center' in self.vector_location) or ('centre' in self.vector_location):
-            x = self.origin_x - _width / 2
-        else:
-            x = self.image_width - self.plot_border - _width
+        x, y = self.get_label_xy(self.vector_anchor, _width, _height)
         # draw our text, be prepared to catch a unicode encode error
         try:
             self.draw.text((x, y),
@@ -2329,14 +2807,135 @@ class PolarWindTrailPlot(PolarWindPlot):
             label text for the given ring number
         """
 
-        label_inc = self.max_vector_radius / self.rings
-        return ''.join([str(int(round(label_inc * ring, 0))), self.ring_units])
+        return str(int(round(self.ring_label_inc * ring, 0))) + self.ring_units
+
+
+# =============================================================================
+#                                Class Polyline
+# =============================================================================
+
+class Polyline(object):
+    """Draw consecutive line segments of the same colour as polylines.
+
+    Drawing a polyline with a single draw.line() call is cheaper than drawing
+    each segment in turn and, provided no joint is used, produces the same
+    result. Points are added to the current polyline until the colour
+    changes, the polyline is then drawn and a new polyline started from the
+    last point.
+    """
+
+    def __init__(self, draw, width, point=None):
+        # the ImageDraw object to draw on
+        self.draw = draw
+        # line width in pixels
+        self.width = width
+        # the points and colour of the current polyline
+        self.points = [point] if point is not None else []
+        self.color = None
+
+    def start(self, point):
+        """Start the polyline at a given point."""
+
+        self.points = [point]
+
+    def add(self, point, color):
+        """Add a segment from the last point to a given point.
+
+        If the colour has changed draw the polyline so far and start a new
+        polyline from the last point.
+        """
+
+        if color != self.color:
+            self.flush()
+            self.color = color
+        self.points.append(point)
+
+    def flush(self):
+        """Draw the polyline so far, the last point starts the next polyline."""
+
+        if len(self.points) > 1:
+            self.draw.line(self.points, fill=self.color, width=self.width)
+        self.points = self.points[-1:]
+
+
+# =============================================================================
+#                              Class BearingTrig
+# =============================================================================
+
+class BearingTrig(dict):
+    """Cache of the sine and cosine of bearings.
+
+    Wind directions often repeat so rather than calculate the sine and cosine
+    of each sample's bearing they are calculated the first time a bearing is
+    used and cached. Indexing with a bearing in degrees returns a tuple
+    (sine, cosine).
+    """
+
+    def __missing__(self, bearing):
+        theta = bearing * DEG_TO_RAD
+        result = self[bearing] = (math.sin(theta), math.cos(theta))
+        return result
+
+
+# =============================================================================
+#                              Polar plot types
+# =============================================================================
+
+# map of supported plot_type config option values to the plot class used
+POLAR_PLOT_TYPES = {'rose': PolarWindRosePlot,
+                    'trail': PolarWindTrailPlot,
+                    'spiral': PolarWindSpiralPlot,
+                    'scatter': PolarWindScatterPlot}
 
 
 # =============================================================================
 #                             Utility functions
 # =============================================================================
 
+def accumulate_scalars(options, section):
+    """Merge the scalars of a config section with its parent's options.
+
+    A lighter weight alternative to weeutil.weeutil.accumulateLeaves() for
+    use when the accumulated options of the section's parent are already
+    known. Avoids walking the config tree to its root for every section.
+
+    Inputs:
+        options: dict of the accumulated options of the section's parent
+        section: ConfigObj section whose scalars are to be merged
+
+    Returns:
+        a dict of the accumulated options for section
+    """
+
+    _options = dict(options)
+    _options.update((key, section[key]) for key in section.scalars)
+    return _options
+
+
+def get_label_anchor(location):
+    """Resolve a label location to a single vertical and horizontal anchor.
+
+    Inputs:
+        location: set of location strings eg {'top', 'left'} or None
+
+    Returns:
+        a tuple (vertical, horizontal) where vertical is 'top' or 'bottom' and
+        horizontal is 'left', 'centre' or 'right'. None is returned if
+        location is None.
+    """
+
+    if not location:
+        return None
+    vertical = 'top' if 'top' in location else 'bottom'
+    if 'left' in location:
+        horizontal = 'left'
+    elif 'center' in location or 'centre' in location:
+        horizontal = 'centre'
+    else:
+        horizontal = 'right'
+    return vertical, horizontal
+
+
 def parse_color(color, default=None):
     """Parse a string representing a color.
 
@@ -2353,14 +2952,43 @@ def parse_color(color, default=None):
         a valid rgb tuple or the default value
     """
 
-    # do we have a valid color or none (in any case)
+    # if we have already been given an rgb(a) tuple there is nothing to parse
+    if isinstance(color, tuple) and len(color) in (3, 4):
+        return color
+    # do we have a valid color
+    result = _getrgb(color)
+    if result is None and default is not None:
+        # we could not parse color; most likely it is not a recognised color
+        # string or maybe it is None. Either way use the default.
+        result = _getrgb(default)
+    return result
+
+
+def _getrgb(color):
+    """Parse a color to an rgb tuple.
+
+    The same colours (eg the defaults) are parsed for every plot so the
+    result of parsing each colour is cached.
+
+    Returns:
+        an rgb tuple or None if color cannot be parsed to a valid colour
+    """
+
+    try:
+        return _RGB_CACHE[color]
+    except KeyError:
+        pass
+    except TypeError:
+        # color is not hashable (eg a list) so it cannot be a valid colour
+        return None
     try:
-        result = ImageColor.getrgb(color)
+        _rgb = ImageColor.getrgb(color)
     except (ValueError, AttributeError, TypeError):
         # getrgb() cannot parse color; most likely it is not a recognised
-        # color string or maybe it is None. Either way use the default.
-        result = parse_color(default) if default is not None else None
-    return result
+        # color string or maybe it is None
+        _rgb = None
+    _RGB_CACHE[color] = _rgb
+    return _rgb
 
 
 def color_trans(start_color, end_color, proportion):
@@ -2376,16 +3004,39 @@ def color_trans(start_color, end_color, proportion):
                      resulting color on the linear transition from
                      start_color (0) to end_color (1).
      Returns:
-        A string in the format #RRGGBB
+        A 3-way tuple with rgb components of the resulting color. PIL accepts
+        rgb tuples directly so there is no need to format (and have PIL then
+        parse) a #RRGGBB string.
     """
 
     # get rgb components of the start and end colors
     start_r, start_g, start_b = start_color
     end_r, end_g, end_b = end_color
 
+    # the weighting of the start color
+    remainder = 1 - proportion
     # calculate the transitional color rgb components
-    r = int((1 - proportion) * start_r + proportion * end_r + 0.5)
-    g = int((1 - proportion) * start_g + proportion * end_g + 0.5)
-    b = int((1 - proportion) * start_b + proportion * end_b + 0.5)
-    # return the resulting transitional color in #RRGGBB format
-    return '#%02x%02x%02x' % (r, g, b)
+    r = int(remainder * start_r + proportion * end_r + 0.5)
+    g = int(remainder * start_g + proportion * end_g + 0.5)
+    b = int(remainder * start_b + proportion * end_b + 0.5)
+    # return the resulting transitional color as an rgb tuple
+    return r, g, b
+
+
+def color_trans_list(start_color, end_color, proportions):
+    """Get a list of colors on a linear transition between two given colors.
+
+    A batch version of color_trans() for use when many colors on the same
+    transition are required.
+
+    Inputs:
+        start_color: 3-way tuple with rgb components of start color.
+        end_color:   3-way tuple with rgb components of end color.
+        proportions: Iterable of floats in range 0 to 1 inclusive that
+                     determine each resulting color on the linear transition
+                     from start_color (0) to end_color (1).
+     Returns:
+        A list of 3-way tuples with rgb components of each color
+    """
+
+    return [color_trans(start_color, end_color, p) for p in proportions]
@@ -41,14 +41,29 @@ def version_compare(v1, v2):
         +1 if v1 is greater than v2
     """
 
-    import itertools
-    mash = itertools.zip_longest(v1.split('.'), v2.split('.'), fillvalue='0')
-    for x1, x2 in mash:
-        if x1 > x2:
-            return 1
-        if x1 < x2:
-            return -1
-    return 0
+    import re
+
+    def version_tuple(v):
+        """Convert a version string to a tuple of integers.
+
+        Only the leading digits of each component are used so that
+        pre-release versions such as '5.0.0b1' can be compared.
+        """
+
+        parts = []
+        for part in v.split('.'):
+            _match = re.match(r'\d+', part)
+            parts.append(int(_match.group()) if _match else 0)
+        return parts
+
+    t1 = version_tuple(v1)
+    t2 = version_tuple(v2)
+    # pad the shorter version with zeros so that eg 4.10 and 4.10.0 are equal
+    _len = max(len(t1), len(t2))
+    t1 = tuple(t1 + [0] * (_len - len(t1)))
+    t2 = tuple(t2 + [0] * (_len - len(t2)))
+    # compare numerically so that eg 4.10 is greater than 4.9
+    return (t1 > t2) - (t1 < t2)
 
 
 def loader():